@@ -1,28 +1,72 @@
 # admin_dashboard.py
 
 import streamlit as st
-from utils import go_to, extract_content, get_file_type, parse_and_store_resume, evaluate_jd_fit, extract_jd_from_linkedin_url
-import tempfile
-import os
-import re
+from utils import go_to, extract_uploaded_files, parse_and_store_resumes, match_resumes_to_jd, extract_jd_from_linkedin_url, match_results_frame, split_pasted_jds, jd_title, content_digest
 from datetime import date
-import traceback
-import json
 
 # Helper function specific to Admin Dashboard
-def update_resume_status(resume_name, new_status, applied_jd, submitted_date, resume_list_index):
+def add_admin_jds(jd_items):
     """
-    Callback function to update the status and metadata of a specific resume.
+    Appends the JDs whose text isn't loaded yet to the admin list in one assignment
+    (duplicates are skipped with a warning). Returns the items that were added.
     """
-    st.session_state.resume_statuses[resume_name] = new_status
-    
-    if 0 <= resume_list_index < len(st.session_state.resumes_to_analyze):
-        st.session_state.resumes_to_analyze[resume_list_index]['applied_jd'] = applied_jd
-        st.session_state.resumes_to_analyze[resume_list_index]['submitted_date'] = submitted_date
-        st.success(f"Status and metadata for **{resume_name}** updated to **{new_status}**.")
-    else:
-        st.error(f"Error: Could not find resume index {resume_list_index} for update.")
-        
+    new_jds = {}
+    for jd_item in jd_items:
+        digest = content_digest(jd_item['content'])
+        if digest in new_jds or digest in st.session_state.admin_jd_hashes:
+            st.warning(f"Duplicate JD skipped: {jd_item['name']}")
+            continue
+        new_jds[digest] = jd_item
+    if new_jds:
+        st.session_state.admin_jd_list = st.session_state.admin_jd_list + list(new_jds.values())
+        st.session_state.admin_jd_hashes = st.session_state.admin_jd_hashes | new_jds.keys()
+    return list(new_jds.values())
+
+RESUME_STATUS_OPTIONS = ("Pending", "Approved", "Rejected", "Shortlisted")
+RESUME_STATUS_INDEX = {status: i for i, status in enumerate(RESUME_STATUS_OPTIONS)}
+VENDOR_STATUS_OPTIONS = ("Pending Review", "Approved", "Rejected")
+VENDOR_STATUS_INDEX = {status: i for i, status in enumerate(VENDOR_STATUS_OPTIONS)}
+
+ADMIN_RESULT_COLUMNS = {
+    "resume_name": "Resume",
+    "jd_name": "JD",
+    "overall_score": "Fit Score (out of 10)",
+    "skills_percent": "Skills (%)",
+    "experience_percent": "Experience (%)",
+    "education_percent": "Education (%)",
+}
+
+def apply_resume_updates(row_updates):
+    """
+    Applies the Candidate Approval form's (index, name, status, applied JD, submitted date) rows
+    in one pass, touching only the resumes that changed. Returns how many changed.
+    """
+    resumes = st.session_state.resumes_to_analyze
+    statuses = dict(st.session_state.resume_statuses)
+    changed = 0
+    for idx, resume_name, new_status, applied_jd, submitted_date in row_updates:
+        resume_data = resumes[idx]
+        current = (statuses.get(resume_name, "Pending"), resume_data.get('applied_jd'), resume_data.get('submitted_date'))
+        if current == (new_status, applied_jd, submitted_date):
+            continue
+        statuses[resume_name] = new_status
+        resume_data['applied_jd'] = applied_jd
+        resume_data['submitted_date'] = submitted_date
+        changed += 1
+    st.session_state.resume_statuses = statuses
+    return changed
+
+def update_resume_statuses(resume_names, new_status):
+    """
+    Sets the same status on several resumes in a single session-state write.
+    """
+    st.session_state.resume_statuses = {**st.session_state.resume_statuses, **dict.fromkeys(resume_names, new_status)}
+    # Drop the per-row status widgets' state so they pick up the new status on the rerun
+    selected = set(resume_names)
+    for idx, resume_data in enumerate(st.session_state.resumes_to_analyze):
+        if resume_data['name'] in selected:
+            st.session_state.pop(f"status_select_{resume_data['name']}_{idx}", None)
+
 # --- NEWLY ISOLATED FUNCTIONS FOR APPROVAL TABS ---
 
 def candidate_approval_tab_content():
@@ -35,78 +79,97 @@ def candidate_approval_tab_content():
         
     jd_options = [item['name'].replace("--- Simulated JD for: ", "") for item in st.session_state.admin_jd_list]
     jd_options.insert(0, "Select JD") 
-
-    for idx, resume_data in enumerate(st.session_state.resumes_to_analyze):
-        resume_name = resume_data['name']
-        current_status = st.session_state.resume_statuses.get(resume_name, "Pending")
+    # Built once so each resume row resolves its selected JD with a dict lookup instead of a list scan
+    jd_option_index = {}
+    for i, option in enumerate(jd_options):
+        jd_option_index.setdefault(option, i)
+
+    with st.container(border=True):
+        st.markdown("**Bulk Status Update**")
+        col_bulk_select, col_bulk_status, col_bulk_btn = st.columns([3, 2, 1])
+        with col_bulk_select:
+            bulk_names = st.multiselect(
+                "Resumes",
+                list(dict.fromkeys(resume_data['name'] for resume_data in st.session_state.resumes_to_analyze)),
+                key="bulk_status_resumes",
+                label_visibility="collapsed",
+                placeholder="Select resumes..."
+            )
+        with col_bulk_status:
+            bulk_status = st.selectbox(
+                "Bulk Status",
+                RESUME_STATUS_OPTIONS,
+                index=RESUME_STATUS_INDEX["Approved"],
+                key="bulk_status_value",
+                label_visibility="collapsed"
+            )
+        with col_bulk_btn:
+            if st.button("Apply to Selected", key="bulk_status_btn", disabled=not bulk_names):
+                update_resume_statuses(bulk_names, bulk_status)
+                st.rerun()
+
+    # One form for every row: edits don't rerun the page, and "Apply All Changes" commits them together
+    with st.form("candidate_bulk_status", border=False):
+        row_updates = []
+        for idx, resume_data in enumerate(st.session_state.resumes_to_analyze):
+            resume_name = resume_data['name']
+            current_status = st.session_state.resume_statuses.get(resume_name, "Pending")
         
-        current_applied_jd = resume_data.get('applied_jd', 'N/A (Pending Assignment)')
-        current_submitted_date = resume_data.get('submitted_date', date.today().strftime("%Y-%m-%d"))
+            current_applied_jd = resume_data.get('applied_jd', 'N/A (Pending Assignment)')
+            current_submitted_date = resume_data.get('submitted_date', date.today().strftime("%Y-%m-%d"))
 
-        with st.container(border=True):
-            st.markdown(f"**Resume:** **{resume_name}**")
+            with st.container(border=True):
+                st.markdown(f"**Resume:** **{resume_name}**")
             
-            col_jd_input, col_date_input = st.columns(2)
+                col_jd_input, col_date_input = st.columns(2)
             
-            with col_jd_input:
-                try:
+                with col_jd_input:
                     default_value = current_applied_jd if current_applied_jd != "N/A (Pending Assignment)" else "Select JD"
-                    jd_default_index = jd_options.index(default_value)
-                except ValueError:
-                    jd_default_index = 0
+                    jd_default_index = jd_option_index.get(default_value, 0)
                     
-                new_applied_jd = st.selectbox(
-                    "Applied for JD Title", 
-                    options=jd_options,
-                    index=jd_default_index,
-                    key=f"jd_select_{resume_name}_{idx}",
-                )
+                    new_applied_jd = st.selectbox(
+                        "Applied for JD Title", 
+                        options=jd_options,
+                        index=jd_default_index,
+                        key=f"jd_select_{resume_name}_{idx}",
+                    )
                 
-            with col_date_input:
-                try:
-                    date_obj = date.fromisoformat(current_submitted_date)
-                except (ValueError, TypeError):
-                    date_obj = date.today()
+                with col_date_input:
+                    try:
+                        date_obj = date.fromisoformat(current_submitted_date)
+                    except (ValueError, TypeError):
+                        date_obj = date.today()
                     
-                new_submitted_date = st.date_input(
-                    "Submitted Date", 
-                    value=date_obj,
-                    key=f"date_input_{resume_name}_{idx}"
-                )
+                    new_submitted_date = st.date_input(
+                        "Submitted Date", 
+                        value=date_obj,
+                        key=f"date_input_{resume_name}_{idx}"
+                    )
                 
-            st.markdown(f"**Current Status:** **{current_status}**")
+                st.markdown(f"**Current Status:** **{current_status}**")
             
-            st.markdown("---")
+                st.markdown("---")
             
-            col1, col2 = st.columns([3, 1])
-            
-            with col1:
                 st.markdown("Set Status:")
                 new_status = st.selectbox(
                     "Set Status",
-                    ["Pending", "Approved", "Rejected", "Shortlisted"],
-                    index=["Pending", "Approved", "Rejected", "Shortlisted"].index(current_status),
+                    RESUME_STATUS_OPTIONS,
+                    index=RESUME_STATUS_INDEX.get(current_status, 0),
                     key=f"status_select_{resume_name}_{idx}",
                     label_visibility="collapsed"
                 )
 
-            with col2:
-                if st.button("Update", key=f"update_btn_{resume_name}_{idx}"):
-                    
-                    if new_applied_jd == "Select JD" and len(jd_options) > 1:
-                        jd_to_save = "N/A (Pending Assignment)"
-                    else:
-                        jd_to_save = new_applied_jd
-                        
-                    update_resume_status(
-                        resume_name, 
-                        new_status, 
-                        jd_to_save, 
-                        new_submitted_date.strftime("%Y-%m-%d"),
-                        idx
-                    )
-                    st.rerun() 
-            
+                if new_applied_jd == "Select JD" and len(jd_options) > 1:
+                    jd_to_save = "N/A (Pending Assignment)"
+                else:
+                    jd_to_save = new_applied_jd
+                row_updates.append((idx, resume_name, new_status, jd_to_save, new_submitted_date.strftime("%Y-%m-%d")))
+
+        if st.form_submit_button("Apply All Changes", use_container_width=True):
+            if apply_resume_updates(row_updates):
+                st.rerun()
+            st.info("No changes to apply.")
+
     st.markdown("---")
             
     summary_data = []
@@ -127,10 +190,6 @@ def vendor_approval_tab_content():
     st.header("🤝 Vendor Approval") 
     
     st.markdown("### 1. Add New Vendor")
-    if "vendors" not in st.session_state:
-        st.session_state.vendors = []
-    if "vendor_statuses" not in st.session_state:
-        st.session_state.vendor_statuses = {}
         
     with st.form("add_vendor_form"):
         col1, col2 = st.columns(2)
@@ -145,7 +204,7 @@ def vendor_approval_tab_content():
         with col4:
             initial_status = st.selectbox(
                 "Set Status", 
-                ["Pending Review", "Approved", "Rejected"],
+                VENDOR_STATUS_OPTIONS,
                 key="new_vendor_status"
             )
         
@@ -193,8 +252,8 @@ def vendor_approval_tab_content():
                 with col_status_input:
                     new_status = st.selectbox(
                         "Set Status",
-                        ["Pending Review", "Approved", "Rejected"],
-                        index=["Pending Review", "Approved", "Rejected"].index(current_status),
+                        VENDOR_STATUS_OPTIONS,
+                        index=VENDOR_STATUS_INDEX.get(current_status, 0),
                         key=f"vendor_status_select_{idx}",
                         label_visibility="collapsed"
                     )
@@ -237,6 +296,7 @@ def admin_dashboard():
     
     # Initialize Admin session state variables (Defensive check)
     if "admin_jd_list" not in st.session_state: st.session_state.admin_jd_list = []
+    if "admin_jd_hashes" not in st.session_state: st.session_state.admin_jd_hashes = {content_digest(jd['content']) for jd in st.session_state.admin_jd_list}
     if "resumes_to_analyze" not in st.session_state: st.session_state.resumes_to_analyze = []
     if "admin_match_results" not in st.session_state: st.session_state.admin_match_results = []
     if "resume_statuses" not in st.session_state: st.session_state.resume_statuses = {}
@@ -269,19 +329,19 @@ def admin_dashboard():
             )
             if st.button("Add JD(s) from URL", key="add_jd_url_btn_admin"):
                 if url_list:
-                    urls = [u.strip() for u in url_list.split(",")] if jd_type == "Multiple JD" else [url_list.strip()]
+                    urls = [u for u in (u.strip() for u in (url_list.split(",") if jd_type == "Multiple JD" else [url_list])) if u]
                     
-                    count = 0
-                    for url in urls:
-                        if not url: continue
-                        
-                        with st.spinner(f"Attempting JD extraction for: {url}"):
+                    jd_items = []
+                    # One spinner and progress bar for the whole batch rather than a spinner per URL
+                    with st.spinner(f"Extracting {len(urls)} JD(s)..."):
+                        progress_bar = st.progress(0.0)
+                        for i, url in enumerate(urls, 1):
                             jd_text = extract_jd_from_linkedin_url(url)
-                        
-                        name_base = url.split('/jobs/view/')[-1].split('/')[0] if '/jobs/view/' in url else f"URL {count+1}"
-                        st.session_state.admin_jd_list.append({"name": f"JD from URL: {name_base}", "content": jd_text})
-                        if not jd_text.startswith("[Error"):
-                            count += 1
+                            name_base = url.split('/jobs/view/')[-1].split('/')[0] if '/jobs/view/' in url else f"URL {i}"
+                            jd_items.append({"name": f"JD from URL: {name_base}", "content": jd_text})
+                            progress_bar.progress(i / len(urls), text=f"Extracted {i} of {len(urls)} JD(s)...")
+                        progress_bar.empty()
+                    count = sum(not jd_item['content'].startswith("[Error") for jd_item in add_admin_jds(jd_items))
                             
                     if count > 0:
                         st.success(f"✅ {count} JD(s) added successfully! Check the display below for the extracted content.")
@@ -296,15 +356,13 @@ def admin_dashboard():
             )
             if st.button("Add JD(s) from Text", key="add_jd_text_btn_admin"):
                 if text_list:
-                    texts = [t.strip() for t in text_list.split("---")] if jd_type == "Multiple JD" else [text_list.strip()]
-                    for i, text in enumerate(texts):
-                         if text:
-                            name_base = text.splitlines()[0].strip()
-                            if len(name_base) > 30: name_base = f"{name_base[:27]}..."
-                            if not name_base: name_base = f"Pasted JD {len(st.session_state.admin_jd_list) + i + 1}"
-                            
-                            st.session_state.admin_jd_list.append({"name": name_base, "content": text})
-                    st.success(f"✅ {len(texts)} JD(s) added successfully!")
+                    texts = split_pasted_jds(text_list, multiple=(jd_type == "Multiple JD"))
+                    count = len(add_admin_jds([
+                        {"name": jd_title(text) or f"Pasted JD {len(st.session_state.admin_jd_list) + i + 1}", "content": text}
+                        for i, text in enumerate(texts)
+                    ]))
+                    if count > 0:
+                        st.success(f"✅ {count} JD(s) added successfully!")
 
         # Upload File
         elif method == "Upload File":
@@ -321,22 +379,13 @@ def admin_dashboard():
                     
                 files_to_process = uploaded_files if isinstance(uploaded_files, list) else ([uploaded_files] if uploaded_files else [])
                 
-                count = 0
-                for file in files_to_process:
-                    if file: 
-                        temp_dir = tempfile.mkdtemp()
-                        temp_path = os.path.join(temp_dir, file.name)
-                        with open(temp_path, "wb") as f:
-                            f.write(file.getbuffer())
-                            
-                        file_type = get_file_type(temp_path)
-                        jd_text = extract_content(file_type, temp_path)
-                        
-                        if not jd_text.startswith("Error"):
-                            st.session_state.admin_jd_list.append({"name": file.name, "content": jd_text})
-                            count += 1
-                        else:
-                            st.error(f"Error extracting content from {file.name}: {jd_text}")
+                jd_items = []
+                for file, jd_text in zip(files_to_process, extract_uploaded_files(files_to_process)):
+                    if not jd_text.startswith("Error"):
+                        jd_items.append({"name": file.name, "content": jd_text})
+                    else:
+                        st.error(f"Error extracting content from {file.name}: {jd_text}")
+                count = len(add_admin_jds(jd_items))
                             
                 if count > 0:
                     st.success(f"✅ {count} JD(s) added successfully!")
@@ -355,6 +404,7 @@ def admin_dashboard():
             with col_clear_button:
                 if st.button("🗑️ Clear All JDs", key="clear_jds_admin", use_container_width=True, help="Removes all currently loaded JDs."):
                     st.session_state.admin_jd_list = []
+                    st.session_state.admin_jd_hashes = set()
                     st.session_state.admin_match_results = [] 
                     st.success("All JDs and associated match results have been cleared.")
                     st.rerun() 
@@ -392,24 +442,46 @@ def admin_dashboard():
                     files_to_process = uploaded_files if isinstance(uploaded_files, list) else ([uploaded_files] if uploaded_files else [])
                     
                     count = 0
-                    with st.spinner("Parsing resume(s)... This may take a moment."):
-                        for file in files_to_process:
-                            if file: 
-                                result = parse_and_store_resume(file, file_name_key='admin_analysis')
+                    # Resumes already in the analysis list are skipped, so re-clicking doesn't duplicate them
+                    loaded_digests = {item.get('digest') for item in st.session_state.resumes_to_analyze}
+                    new_files = []
+                    new_digests = []
+                    for file in files_to_process:
+                        if not file: continue
+                        digest = content_digest(file.getbuffer())
+                        if digest in loaded_digests:
+                            st.info(f"{file.name} is already loaded.")
+                        else:
+                            new_files.append(file)
+                            new_digests.append(digest)
+
+                    if new_files:
+                        progress_bar = st.progress(0.0, text=f"Parsing {len(new_files)} resume(s)...")
+                        results = parse_and_store_resumes(
+                            new_files, file_name_key='admin_analysis', digests=new_digests,
+                            on_progress=lambda done, total: progress_bar.progress(done / total, text=f"Parsed {done} of {total} resume(s)...")
+                        )
+                        progress_bar.empty()
+
+                        for file, result in zip(new_files, results):
+                            if "error" not in result:
+                                if result['digest'] in loaded_digests: continue
+                                # Session state is re-serialized every rerun and nothing here reads the raw
+                                # text after parsing, so it isn't kept per resume
+                                result.pop('full_text', None)
+                                result['applied_jd'] = "N/A (Pending Assignment)"
+                                result['submitted_date'] = date.today().strftime("%Y-%m-%d")
+                                
+                                st.session_state.resumes_to_analyze.append(result)
+                                loaded_digests.add(result['digest'])
                                 
-                                if "error" not in result:
-                                    result['applied_jd'] = "N/A (Pending Assignment)"
-                                    result['submitted_date'] = date.today().strftime("%Y-%m-%d")
-                                    
-                                    st.session_state.resumes_to_analyze.append(result)
-                                    
-                                    resume_id = result['name']
-                                    if resume_id not in st.session_state.resume_statuses:
-                                        st.session_state.resume_statuses[resume_id] = "Pending"
-                                    
-                                    count += 1
-                                else:
-                                    st.error(f"Failed to parse {file.name}: {result['error']}")
+                                resume_id = result['name']
+                                if resume_id not in st.session_state.resume_statuses:
+                                    st.session_state.resume_statuses[resume_id] = "Pending"
+                                
+                                count += 1
+                            else:
+                                st.error(f"Failed to parse {file.name}: {result['error']}")
 
                     if count > 0:
                         st.success(f"Successfully loaded and parsed {count} resume(s) for analysis.")
@@ -441,21 +513,26 @@ def admin_dashboard():
             return
 
         resume_names = [r['name'] for r in st.session_state.resumes_to_analyze]
-        selected_resume_names = st.multiselect(
+        selected_resume_names = set(st.multiselect(
             "Select Resume(s) for Matching",
             options=resume_names,
             default=resume_names, 
             key="select_resumes_admin"
-        )
+        ))
         
         resumes_to_match = [
             r for r in st.session_state.resumes_to_analyze 
             if r['name'] in selected_resume_names
         ]
 
-        jd_options = {item['name']: item['content'] for item in st.session_state.admin_jd_list}
-        selected_jd_name = st.selectbox("Select JD for Matching", list(jd_options.keys()), key="select_jd_admin")
-        selected_jd_content = jd_options.get(selected_jd_name, "")
+        # Select by position so no name->content dict of every JD is built on each rerun
+        admin_jd_list = st.session_state.admin_jd_list
+        selected_jd_idx = st.selectbox(
+            "Select JD for Matching", range(len(admin_jd_list)),
+            format_func=lambda i: admin_jd_list[i]['name'], key="select_jd_admin"
+        )
+        selected_jd_name = admin_jd_list[selected_jd_idx]['name']
+        selected_jd_content = admin_jd_list[selected_jd_idx]['content']
 
 
         if st.button(f"Run Match Analysis on {len(resumes_to_match)} Selected Resume(s)", key="run_match_analysis_admin"):
@@ -469,55 +546,24 @@ def admin_dashboard():
                 st.warning("No resumes were selected for matching.")
                 return
 
-            with st.spinner(f"Matching {len(resumes_to_match)} resumes against '{selected_jd_name}'..."):
-                for resume_data in resumes_to_match: 
-                    
-                    resume_name = resume_data['name']
-                    parsed_json = resume_data['parsed']
-
-                    try:
-                        fit_output = evaluate_jd_fit(selected_jd_content, parsed_json)
-                        
-                        overall_score_match = re.search(r'Overall Fit Score:\s*[^\d]*(\d+)\s*/10', fit_output, re.IGNORECASE)
-                        section_analysis_match = re.search(
-                             r'--- Section Match Analysis ---\s*(.*?)\s*Strengths/Matches:', 
-                             fit_output, re.DOTALL
-                        )
+            with st.status(f"Matching {len(resumes_to_match)} resumes against '{selected_jd_name}'...", expanded=True) as match_status:
+                parsed_jsons = [r['parsed'] for r in resumes_to_match]
+                progress_bar = st.progress(0.0, text=f"Scoring {len(parsed_jsons)} resume(s)...")
+                fit_results = match_resumes_to_jd(
+                    selected_jd_content, parsed_jsons,
+                    on_progress=lambda done, total, retrying: progress_bar.progress(
+                        done / total, text=f"{'Retried' if retrying else 'Scored'} {done} of {total} resume(s)..."
+                    )
+                )
 
-                        skills_percent, experience_percent, education_percent = 'N/A', 'N/A', 'N/A'
-                        
-                        if section_analysis_match:
-                            section_text = section_analysis_match.group(1)
-                            skills_match = re.search(r'Skills Match:\s*\[?(\d+)%\]?', section_text, re.IGNORECASE)
-                            experience_match = re.search(r'Experience Match:\s*\[?(\d+)%\]?', section_text, re.IGNORECASE)
-                            education_match = re.search(r'Education Match:\s*\[?(\d+)%\]?', section_text, re.IGNORECASE)
-                            
-                            if skills_match: skills_percent = skills_match.group(1)
-                            if experience_match: experience_percent = experience_match.group(1)
-                            if education_match: education_percent = education_match.group(1)
-                        
-                        overall_score = overall_score_match.group(1) if overall_score_match else 'N/A'
-
-                        st.session_state.admin_match_results.append({
-                            "resume_name": resume_name,
-                            "jd_name": selected_jd_name,
-                            "overall_score": overall_score,
-                            "skills_percent": skills_percent,
-                            "experience_percent": experience_percent, 
-                            "education_percent": education_percent,   
-                            "full_analysis": fit_output
-                        })
-                    except Exception as e:
-                        st.session_state.admin_match_results.append({
-                            "resume_name": resume_name,
-                            "jd_name": selected_jd_name,
-                            "overall_score": "Error",
-                            "skills_percent": "Error",
-                            "experience_percent": "Error", 
-                            "education_percent": "Error",   
-                            "full_analysis": f"Error running analysis: {e}\n{traceback.format_exc()}"
-                        })
-                st.success("Analysis complete!")
+                for resume_data, fit_result in zip(resumes_to_match, fit_results):
+                    st.session_state.admin_match_results.append({
+                        "resume_name": resume_data['name'],
+                        "jd_name": selected_jd_name,
+                        **fit_result
+                    })
+                progress_bar.empty()
+                match_status.update(label="Analysis complete!", state="complete", expanded=False)
 
 
         # 3. Display Results
@@ -525,27 +571,21 @@ def admin_dashboard():
             st.markdown("#### 3. Match Results")
             results_df = st.session_state.admin_match_results
             
-            display_data = []
-            for item in results_df:
-                status = st.session_state.resume_statuses.get(item["resume_name"], 'Pending') 
-                
-                display_data.append({
-                    "Resume": item["resume_name"],
-                    "JD": item["jd_name"],
-                    "Fit Score (out of 10)": item["overall_score"],
-                    "Skills (%)": item.get("skills_percent", "N/A"),
-                    "Experience (%)": item.get("experience_percent", "N/A"), 
-                    "Education (%)": item.get("education_percent", "N/A"),
-                    "Approval Status": status
-                })
-
-            st.dataframe(display_data, use_container_width=True)
+            display_df = match_results_frame(results_df, ADMIN_RESULT_COLUMNS)
+            display_df["Approval Status"] = display_df["Resume"].map(st.session_state.resume_statuses).fillna('Pending')
+
+            st.dataframe(display_df, use_container_width=True)
 
             st.markdown("##### Detailed Reports")
-            for item in results_df:
-                header_text = f"Report for **{item['resume_name']}** against {item['jd_name']} (Score: **{item['overall_score']}/10** | S: **{item.get('skills_percent', 'N/A')}%** | E: **{item.get('experience_percent', 'N/A')}%** | Edu: **{item.get('education_percent', 'N/A')}%**)"
-                with st.expander(header_text):
-                    st.markdown(item['full_analysis'])
+            # Only the chosen report's markdown is rendered, however many resumes were matched
+            report_idx = st.selectbox(
+                "View detailed report",
+                range(len(results_df)),
+                format_func=lambda i: f"{results_df[i]['resume_name']} against {results_df[i]['jd_name']} (Score: {results_df[i]['overall_score']}/10 | S: {results_df[i].get('skills_percent', 'N/A')}% | E: {results_df[i].get('experience_percent', 'N/A')}% | Edu: {results_df[i].get('education_percent', 'N/A')}%)",
+                key="admin_report_pick"
+            )
+            with st.container(border=True):
+                st.markdown(results_df[report_idx]['full_analysis'])
 
                     
     # --- TAB 3: User Management (NEW PARENT TAB) ---
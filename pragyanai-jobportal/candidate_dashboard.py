@@ -1,56 +1,24 @@
 import streamlit as st
-import re
-import json
 import traceback
-import tempfile
 from datetime import date 
+from utils import (
+    go_to, clear_interview_state, parse_and_store_resume, extract_jd_metadata, extract_jd_from_linkedin_url,
+    match_jds_to_resume, extract_uploaded_files, qa_on_resume_stream,
+    generate_interview_questions_stream, evaluate_interview_answers_stream, init_session_defaults,
+    keyword_similarities, to_pretty_json, cached_pretty_json, cached_excel, json_digest, match_results_frame,
+    split_pasted_jds, jd_title, content_digest, stream_completion, JD_PREFILTER_MIN_SIMILARITY, GROQ_API_KEY
+)
+from jd_store import JDStore
 
-# =========================================================================
-# NOTE: YOU MUST ENSURE THESE FUNCTIONS AND VARIABLES ARE CORRECTLY DEFINED
-# AND IMPORTED FROM YOUR main application file (e.g., app.py).
-# Failure to define these will result in the ModuleNotFoundError you saw.
-# =========================================================================
-
-try:
-    # Attempt to import all necessary functions and clients from the main app file
-    from app import (
-        go_to, 
-        clear_interview_state, 
-        parse_and_store_resume, 
-        qa_on_resume, 
-        generate_interview_questions, 
-        evaluate_interview_answers, 
-        evaluate_jd_fit, 
-        extract_jd_metadata, 
-        extract_jd_from_linkedin_url, 
-        DEFAULT_JOB_TYPES, 
-        DEFAULT_ROLES
-    )
-    # Ensure the Groq/LLM client and config are imported for the new JD Chatbot
-    from app import client, GROQ_MODEL, GROQ_API_KEY 
-except ImportError as e:
-    st.error(f"FATAL ERROR: Could not import necessary components from 'app.py'. Please ensure 'app.py' exists and defines all required functions/variables. Error: {e}")
-    # Define placeholder functions/variables to prevent immediate crash if app.py is missing/empty
-    go_to = lambda x: st.warning("Navigation function 'go_to' not imported.")
-    clear_interview_state = lambda: st.session_state.update(interview_qa=[], evaluation_report="")
-    DEFAULT_JOB_TYPES = ["Full-time", "Part-time", "Contract"]
-    DEFAULT_ROLES = ["Software Engineer", "Data Analyst", "Project Manager"]
-    # Placeholder for LLM client if import fails
-    client = None 
-    GROQ_MODEL = "mixtral-8x7b-32768"
-    GROQ_API_KEY = None
-
-
-# --- NEW JD Chatbot Function (Relies on client and keys from app.py) ---
-
-def jd_qa_on_jd(question, jd_content):
-    """Chatbot for Job Description (Q&A) using LLM."""
-    global client
-    
-    if not GROQ_API_KEY or not client:
-        return "AI Chatbot Disabled: GROQ_API_KEY is not set or LLM client not initialized."
-        
-    prompt = f"""Given the following Job Description (JD):
+# Filter choices offered alongside the roles/job types found in the loaded JDs
+DEFAULT_JOB_TYPES = ["Full-time", "Part-time", "Contract"]
+DEFAULT_ROLES = ["Software Engineer", "Data Analyst", "Project Manager"]
+
+
+# --- JD Chatbot Function ---
+
+def _jd_qa_prompt(question, jd_content):
+    return f"""Given the following Job Description (JD):
     JD Content: {jd_content}
     
     Answer the following question about the JD concisely and directly.
@@ -58,15 +26,17 @@ def jd_qa_on_jd(question, jd_content):
     
     Question: {question}
     """
+
+def jd_qa_on_jd_stream(question, jd_content):
+    """Chatbot for Job Description (Q&A) using LLM; yields the answer in chunks for `st.write_stream`."""
+    if not GROQ_API_KEY:
+        yield "AI Chatbot Disabled: GROQ_API_KEY is not set."
+        return
+
     try:
-        response = client.chat.completions.create(
-            model=GROQ_MODEL, 
-            messages=[{"role": "user", "content": prompt}], 
-            temperature=0.4
-        )
-        return response.choices[0].message.content.strip()
+        yield from stream_completion(_jd_qa_prompt(question, jd_content), temperature=0.4, tier="qa")
     except Exception as e:
-        return f"Error communicating with LLM API: {e}. Check GROQ_API_KEY and network connection."
+        yield f"Error communicating with LLM API: {e}. Check GROQ_API_KEY and network connection."
 
 # --- Candidate Helper Functions ---
 
@@ -228,9 +198,11 @@ def cv_management_tab_content():
                 else:
                     compiled_text += str(v) + "\n\n"
         st.session_state.full_text = compiled_text
+        st.session_state.resume_digest = None
         
         clear_interview_state()
         st.session_state.candidate_match_results = []
+        st.session_state.candidate_results_df = None
         st.success(f"✅ CV data for **{st.session_state.parsed['name']}** successfully generated and loaded!")
         
     st.markdown("---")
@@ -280,12 +252,22 @@ def cv_management_tab_content():
 
         with tab_json:
             st.json(st.session_state.parsed)
-            json_output = json.dumps(st.session_state.parsed, indent=2)
+            parsed_hash = json_digest(st.session_state.parsed)
+            json_output = cached_pretty_json(parsed_hash, st.session_state.parsed)
             st.download_button(
                 label="⬇️ Download CV as JSON File", data=json_output,
                 file_name=f"{st.session_state.parsed.get('name', 'Generated_CV').replace(' ', '_')}_CV_Data.json",
                 mime="application/json", key="download_cv_json_final"
             )
+            # The workbook is only built once asked for, then reused until the CV data changes
+            if st.button("📊 Prepare Excel (.xlsx) Export", key="prepare_cv_excel"):
+                st.session_state.excel_export_hash = parsed_hash
+            if st.session_state.get('excel_export_hash') == parsed_hash:
+                st.download_button(
+                    label="⬇️ Download CV as Excel File", data=cached_excel(parsed_hash, st.session_state.parsed),
+                    file_name=f"{st.session_state.parsed.get('name', 'Generated_CV').replace(' ', '_')}_CV_Data.xlsx",
+                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", key="download_cv_excel"
+                )
 
         with tab_pdf:
             st.markdown("### Download CV as HTML (Print-to-PDF)")
@@ -307,13 +289,13 @@ def cv_management_tab_content():
         st.info("Please fill out the form above and click 'Generate and Load CV Data' or parse a resume in the 'Resume Parsing' tab to see the preview and download options.")
 
 
+@st.fragment
 def filter_jd_tab_content():
     st.header("🔍 Filter Job Descriptions by Criteria")
     st.markdown("Use the filters below to narrow down your saved Job Descriptions.")
 
     if not st.session_state.get('candidate_jd_list'):
         st.info("No Job Descriptions are currently loaded. Please add JDs in the 'JD Management' tab (Tab 4).")
-        if 'filtered_jds_display' not in st.session_state: st.session_state.filtered_jds_display = []
         return
     
     # --- Skill and Role Extraction ---
@@ -396,8 +378,6 @@ def filter_jd_tab_content():
     # --- Display Results ---
     st.markdown("---")
     
-    if 'filtered_jds_display' not in st.session_state: st.session_state.filtered_jds_display = []
-        
     filtered_jds = st.session_state.filtered_jds_display
     
     st.subheader(f"Matching Job Descriptions ({len(filtered_jds)} found)")
@@ -429,6 +409,7 @@ def filter_jd_tab_content():
 
 # --- Sub-Tab Content Functions ---
 
+@st.fragment
 def resume_chatbot_content(is_resume_parsed):
     st.header("💬 Resume Chatbot (Q&A)")
     st.markdown("### Ask any question about the currently loaded resume.")
@@ -437,25 +418,20 @@ def resume_chatbot_content(is_resume_parsed):
     elif "error" in st.session_state.get('parsed', {}):
          st.error("Cannot use Resume Chatbot: Resume data has parsing errors.")
     else:
-        if 'qa_answer' not in st.session_state: st.session_state.qa_answer = ""
-        
         question = st.text_input("Your Question", placeholder="e.g., What are the candidate's key skills?", key="resume_qa_question")
         
         if st.button("Get Answer", key="resume_qa_btn"):
-            with st.spinner("Generating answer..."):
-                try:
-                    answer = qa_on_resume(question)
-                    st.session_state.qa_answer = answer
-                except NameError:
-                    st.error("Function 'qa_on_resume' not imported from 'app.py'. Check your setup.")
-                    st.session_state.qa_answer = "Could not generate an answer (Function Missing)."
-                except Exception as e:
-                    st.error(f"Error during Q&A: {e}")
-                    st.session_state.qa_answer = "Could not generate an answer."
-
-        if st.session_state.get('qa_answer'):
+            # Tokens render as they arrive; the streamed text is the answer display for this run
+            try:
+                answer = st.write_stream(qa_on_resume_stream(question))
+                st.session_state.qa_answer = answer
+            except Exception as e:
+                st.error(f"Error during Q&A: {e}")
+                st.session_state.qa_answer = "Could not generate an answer."
+        elif st.session_state.get('qa_answer'):
             st.text_area("Answer", st.session_state.qa_answer, height=150, key="resume_qa_answer_display")
 
+@st.fragment
 def jd_chatbot_content():
     st.header("🏢 JD Chatbot (Q&A)")
     st.markdown("### Ask questions about any saved Job Description.")
@@ -480,9 +456,6 @@ def jd_chatbot_content():
     st.markdown("---")
     st.markdown("### 2. Ask Your Question")
 
-    # Initialize JD Chatbot state
-    if 'jd_qa_answer' not in st.session_state: st.session_state.jd_qa_answer = ""
-
     question = st.text_input("Your Question", placeholder="e.g., What are the minimum years of experience required?", key="jd_qa_question")
     
     if st.button("Get JD Answer", key="jd_qa_btn"):
@@ -490,29 +463,279 @@ def jd_chatbot_content():
             st.error("Please enter a question.")
             return
 
-        with st.spinner(f"Generating answer about {selected_jd_name}..."):
-            try:
-                answer = jd_qa_on_jd(question, selected_jd_content)
-                st.session_state.jd_qa_answer = answer
-            except Exception as e:
-                st.error(f"Error during JD Q&A: {e}")
-                st.session_state.jd_qa_answer = "Could not generate an answer due to an error."
-
-    if st.session_state.get('jd_qa_answer'):
+        # Tokens render as they arrive; the streamed text is the answer display for this run
+        try:
+            answer = st.write_stream(jd_qa_on_jd_stream(question, selected_jd_content))
+            st.session_state.jd_qa_answer = answer
+        except Exception as e:
+            st.error(f"Error during JD Q&A: {e}")
+            st.session_state.jd_qa_answer = "Could not generate an answer due to an error."
+    elif st.session_state.get('jd_qa_answer'):
         st.text_area("Answer", st.session_state.jd_qa_answer, height=150, key="jd_qa_answer_display")
 
 
+CANDIDATE_RESULT_COLUMNS = {
+    "rank": "Rank",
+    "jd_name": "Job Description (Ranked)",
+    "overall_score": "Fit Score (out of 10)",
+    "similarity": "Keyword Similarity",
+    "skills_percent": "Skills (%)",
+    "experience_percent": "Experience (%)",
+    "education_percent": "Education (%)",
+}
+
+def candidate_results_frame(results):
+    """Builds the batch-match results table, joining each result with its JD's role and job type."""
+    df = match_results_frame(results, CANDIDATE_RESULT_COLUMNS)
+    jd_names = df["Job Description (Ranked)"]
+    jd_list = st.session_state.candidate_jd_list
+    df.insert(2, "Role", jd_names.map({jd['name']: jd.get('role', 'N/A') for jd in jd_list}).fillna('N/A'))
+    df.insert(3, "Job Type", jd_names.map({jd['name']: jd.get('job_type', 'N/A') for jd in jd_list}).fillna('N/A'))
+    df["Job Description (Ranked)"] = jd_names.str.replace("--- Simulated JD for: ", "", regex=False)
+    return df
+
+
+def candidate_jd_known(digest, new_jds):
+    """True if a JD with this content digest is already in the candidate's list or queued in `new_jds`."""
+    return digest in new_jds or digest in st.session_state.candidate_jd_hashes
+
+
+def add_candidate_jds(new_jds):
+    """
+    Adds queued JDs ({content digest: jd item}) to the session list in one assignment
+    and persists them for the logged-in user in one transaction.
+    """
+    if not new_jds:
+        return
+    st.session_state.candidate_jd_list = st.session_state.candidate_jd_list + list(new_jds.values())
+    st.session_state.candidate_jd_hashes = st.session_state.candidate_jd_hashes | new_jds.keys()
+    if st.session_state.get('user_id'):
+        JDStore().insert_many(st.session_state.user_id, list(new_jds.values()))
+
+
+# --- Tab Content Fragments (widget interactions rerun only the tab, not the whole dashboard) ---
+
+@st.fragment
+def interview_prep_tab_content(is_resume_parsed):
+    st.header("Interview Preparation Tools")
+    if not is_resume_parsed or "error" in st.session_state.get('parsed', {}):
+        st.warning("Please upload and successfully parse a resume first.")
+    else:
+        st.subheader("1. Generate Interview Questions")
+        
+        question_section_options = ["skills","experience", "certifications", "projects", "education"]
+        section_choice = st.selectbox(
+            "Select Section", 
+            question_section_options, 
+            key='iq_section_c',
+            on_change=clear_interview_state 
+        )
+        
+        if st.button("Generate Interview Questions", key='iq_btn_c'):
+            with st.container(border=True):
+                try:
+                    # Questions render as they are generated; the list below is parsed from the full text
+                    raw_questions_response = st.write_stream(generate_interview_questions_stream(st.session_state.parsed, section_choice)).strip()
+                    st.session_state.iq_output = raw_questions_response
+                    
+                    st.session_state.interview_qa = [] 
+                    st.session_state.evaluation_report = "" 
+                    
+                    # Simple parsing of question response
+                    q_list = []
+                    current_level = ""
+                    for line in raw_questions_response.splitlines():
+                        line = line.strip()
+                        if line.startswith('[') and line.endswith(']'):
+                            current_level = line.strip('[]')
+                        elif line.lower().startswith('q') and ':' in line:
+                            question_text = line[line.find(':') + 1:].strip()
+                            q_list.append({
+                                "question": f"({current_level}) {question_text}",
+                                "answer": "", "level": current_level
+                            })
+                            
+                    st.session_state.interview_qa = q_list
+                    st.success(f"Generated {len(q_list)} questions based on your **{section_choice}** section.")
+                    
+                except Exception as e:
+                    st.error(f"Error generating questions: {e}")
+                    st.session_state.iq_output = "Error generating questions."
+                    st.session_state.interview_qa = []
+
+        if st.session_state.get('interview_qa'):
+            st.markdown("---")
+            st.subheader("2. Practice and Record Answers")
+            
+            with st.form("interview_practice_form"):
+                
+                for i, qa_item in enumerate(st.session_state.interview_qa):
+                    st.markdown(f"**Question {i+1}:** {qa_item['question']}")
+                    answer = st.text_area(f"Your Answer for Q{i+1}", value=st.session_state.interview_qa[i]['answer'], height=100, key=f'answer_q_{i}', label_visibility='collapsed')
+                    st.session_state.interview_qa[i]['answer'] = answer 
+                    st.markdown("---") 
+                    
+                submit_button = st.form_submit_button("Submit & Evaluate Answers", use_container_width=True)
+
+            if submit_button:
+                
+                if all(item['answer'].strip() for item in st.session_state.interview_qa):
+                    st.markdown("---")
+                    st.subheader("3. AI Evaluation Report")
+                    try:
+                        # The report renders as it is generated and is kept for later reruns
+                        report = st.write_stream(evaluate_interview_answers_stream(st.session_state.interview_qa, st.session_state.parsed))
+                        st.session_state.evaluation_report = report.strip()
+                        st.success("Evaluation complete!")
+                    except Exception as e:
+                        st.error(f"Evaluation failed: {e}")
+                        st.session_state.evaluation_report = f"Evaluation failed: {e}\n{traceback.format_exc()}"
+                else:
+                    st.error("Please answer all generated questions before submitting.")
+            
+            elif st.session_state.get('evaluation_report'):
+                st.markdown("---")
+                st.subheader("3. AI Evaluation Report")
+                st.markdown(st.session_state.evaluation_report)
+
+
+@st.fragment
+def batch_match_tab_content(is_resume_parsed):
+    st.header("🎯 Batch JD Match: Best Matches")
+    st.markdown("Compare your current resume against all saved job descriptions.")
+
+    if not is_resume_parsed:
+        st.warning("Please **upload and parse your resume** or **build your CV** first.")
+    elif not st.session_state.candidate_jd_list:
+        st.error("Please **add Job Descriptions** in the 'JD Management' tab before running batch analysis.")
+    else:
+
+        all_jd_names = [item['name'] for item in st.session_state.candidate_jd_list]
+        selected_jd_names = st.multiselect("Select Job Descriptions to Match Against", options=all_jd_names, default=all_jd_names, key='candidate_batch_jd_select')
+        jds_to_match = [jd_item for jd_item in st.session_state.candidate_jd_list if jd_item['name'] in selected_jd_names]
+        
+        if st.button(f"Run Match Analysis on {len(jds_to_match)} Selected JD(s)"):
+            st.session_state.candidate_match_results = []
+            st.session_state.candidate_results_df = None
+            if not jds_to_match:
+                st.warning("Please select at least one Job Description to run the analysis.")
+            else:
+                resume_name = st.session_state.parsed.get('name', 'Uploaded Resume')
+                parsed_json = st.session_state.parsed
+                results_with_score = []
+
+                with st.status(f"Matching {resume_name}'s resume against {len(jds_to_match)} selected JD(s)...", expanded=True) as match_status:
+                    # Cheap keyword pre-filter: JDs sharing almost no vocabulary with the resume skip the LLM
+                    similarities = keyword_similarities(
+                        st.session_state.full_text or to_pretty_json(parsed_json),
+                        [jd_item['content'] for jd_item in jds_to_match]
+                    )
+                    jds_to_evaluate = []
+                    for jd_item, similarity in zip(jds_to_match, similarities):
+                        similarity = round(similarity, 2)
+                        if similarity >= JD_PREFILTER_MIN_SIMILARITY:
+                            jds_to_evaluate.append((jd_item, similarity))
+                        else:
+                            results_with_score.append({
+                                "jd_name": jd_item['name'], "overall_score": "Low fit", "numeric_score": -1,
+                                "similarity": similarity,
+                                "full_analysis": f"Skipped detailed AI analysis: keyword similarity with your resume is only {similarity:.2f}."
+                            })
+
+                    # Score every remaining JD (batched, with per-JD retries for anything left unscored)
+                    progress_bar = st.progress(0.0, text=f"Scoring {len(jds_to_evaluate)} JD(s)...")
+                    batch_results = match_jds_to_resume(
+                        [jd_item['content'] for jd_item, _ in jds_to_evaluate], parsed_json,
+                        on_progress=lambda done, total, retrying: progress_bar.progress(
+                            done / total, text=f"{'Retried' if retrying else 'Scored'} {done} of {total} JD(s)..."
+                        )
+                    )
+
+                    for (jd_item, similarity), fit_result in zip(jds_to_evaluate, batch_results):
+                        overall_score = fit_result['overall_score']
+                        results_with_score.append({
+                            "jd_name": jd_item['name'],
+                            "numeric_score": int(overall_score) if overall_score.isdigit() else -1,
+                            "similarity": similarity,
+                            **fit_result
+                        })
+
+                    results_with_score.sort(key=lambda x: x['numeric_score'], reverse=True)
+                    current_rank = 1
+                    current_score = -1 
+                    for i, item in enumerate(results_with_score):
+                        if item['numeric_score'] > current_score:
+                            current_rank = i + 1
+                            current_score = item['numeric_score']
+                        item['rank'] = current_rank
+                        del item['numeric_score']
+                        
+                    st.session_state.candidate_match_results = results_with_score
+                    st.session_state.candidate_results_df = candidate_results_frame(results_with_score)
+                    progress_bar.empty()
+                    match_status.update(label="Batch analysis complete!", state="complete", expanded=False)
+
+        if st.session_state.get('candidate_match_results'):
+            st.markdown("#### Match Results for Your Resume")
+            results_df = st.session_state.candidate_match_results
+            if st.session_state.get('candidate_results_df') is None:
+                st.session_state.candidate_results_df = candidate_results_frame(results_df)
+
+            st.dataframe(
+                st.session_state.candidate_results_df, use_container_width=True, hide_index=True,
+                column_config={
+                    "Fit Score (out of 10)": st.column_config.NumberColumn(format="%d"),
+                    "Keyword Similarity": st.column_config.NumberColumn(format="%.2f"),
+                }
+            )
+
+            st.markdown("##### Detailed Reports")
+            # Only the chosen report's markdown is rendered, however many JDs were matched
+            report_idx = st.selectbox(
+                "View detailed report",
+                range(len(results_df)),
+                format_func=lambda i: f"Rank {results_df[i].get('rank', 'N/A')} | {results_df[i]['jd_name'].replace('--- Simulated JD for: ', '')} (Score: {results_df[i]['overall_score']}/10 | S: {results_df[i].get('skills_percent', 'N/A')}% | E: {results_df[i].get('experience_percent', 'N/A')}% | Edu: {results_df[i].get('education_percent', 'N/A')}%)",
+                key="candidate_report_pick"
+            )
+            with st.container(border=True):
+                st.markdown(results_df[report_idx]['full_analysis'])
+
+
 # --- MAIN CANDIDATE DASHBOARD FUNCTION ---
 
+CANDIDATE_SESSION_DEFAULTS = {
+    'parsed': {},
+    'full_text': "",
+    'candidate_jd_list': [],
+    'candidate_match_results': [],
+    'candidate_results_df': None,
+    'filtered_jds_display': [],
+    'candidate_uploaded_resumes': [],
+    'pasted_cv_text': "",
+    'qa_answer': "",
+    'jd_qa_answer': "",
+    'iq_output': "",
+    'interview_qa': [],
+    'evaluation_report': "",
+}
+
 def candidate_dashboard():
-    # Initialize necessary session state variables if they don't exist
-    if 'parsed' not in st.session_state: st.session_state.parsed = {}
-    if 'full_text' not in st.session_state: st.session_state.full_text = ""
-    if 'candidate_jd_list' not in st.session_state: st.session_state.candidate_jd_list = []
-    if 'candidate_match_results' not in st.session_state: st.session_state.candidate_match_results = []
-    if 'filtered_jds_display' not in st.session_state: st.session_state.filtered_jds_display = []
-    if 'candidate_uploaded_resumes' not in st.session_state: st.session_state.candidate_uploaded_resumes = []
-    if 'pasted_cv_text' not in st.session_state: st.session_state.pasted_cv_text = ""
+    # Initialize necessary session state variables if they don't exist (the tabs below rely on them)
+    init_session_defaults(CANDIDATE_SESSION_DEFAULTS)
+
+    # Load the user's saved JDs whenever a different user logs in; logging out keeps session state,
+    # so the previous user's JDs and the results computed from them are replaced here
+    user_id = st.session_state.get('user_id')
+    if user_id and st.session_state.get('candidate_jds_loaded_for') != user_id:
+        st.session_state.candidate_jd_list = JDStore().load(user_id)
+        st.session_state.pop('candidate_jd_hashes', None)
+        st.session_state.candidate_match_results = []
+        st.session_state.candidate_results_df = None
+        st.session_state.filtered_jds_display = []
+        st.session_state.candidate_jds_loaded_for = user_id
+    # Digests of the loaded JD texts, so re-adding the same JD (e.g. via a different URL) is skipped
+    if 'candidate_jd_hashes' not in st.session_state:
+        st.session_state.candidate_jd_hashes = {content_digest(jd['content']) for jd in st.session_state.candidate_jd_list}
 
 
     st.header("👩‍🎓 Candidate Dashboard")
@@ -581,25 +804,29 @@ def candidate_dashboard():
             
             if file_to_parse:
                 if st.button(f"Parse and Load: **{file_to_parse.name}**", use_container_width=True):
-                    with st.spinner(f"Parsing {file_to_parse.name}..."):
-                        try:
-                            result = parse_and_store_resume(file_to_parse, file_name_key='single_resume_candidate', source_type='file')
+                    file_digest = content_digest(file_to_parse.getbuffer())
+                    if file_digest == st.session_state.get('resume_digest'):
+                        # Same bytes as the resume already loaded: keep its parsed data and interview progress
+                        st.info(f"**{file_to_parse.name}** is already loaded.")
+                    else:
+                        with st.spinner(f"Parsing {file_to_parse.name}..."):
+                            try:
+                                result = parse_and_store_resume(file_to_parse, file_name_key='single_resume_candidate', source_type='file')
                             
-                            if "error" not in result:
-                                st.session_state.parsed = result.get('parsed', {})
-                                st.session_state.full_text = result.get('full_text', "")
-                                st.session_state.excel_data = result.get('excel_data', None) 
-                                st.session_state.parsed['name'] = result.get('name', file_to_parse.name)
-                                clear_interview_state()
-                                st.success(f"✅ Successfully loaded and parsed **{st.session_state.parsed['name']}**.")
-                            else:
-                                st.error(f"Parsing failed for {file_to_parse.name}: {result['error']}")
-                                st.session_state.parsed = {"error": result['error'], "name": result.get('name', file_to_parse.name)}
-                                st.session_state.full_text = result.get('full_text', "")
-                        except NameError:
-                            st.error("Function 'parse_and_store_resume' not imported from 'app.py'. Check your setup.")
-                        except Exception as e:
-                            st.error(f"An unexpected error occurred during parsing: {e}")
+                                if "error" not in result:
+                                    st.session_state.parsed = result.get('parsed', {})
+                                    st.session_state.full_text = result.get('full_text', "")
+                                    st.session_state.parsed['name'] = result.get('name', file_to_parse.name)
+                                    st.session_state.resume_digest = file_digest
+                                    clear_interview_state()
+                                    st.success(f"✅ Successfully loaded and parsed **{st.session_state.parsed['name']}**.")
+                                else:
+                                    st.error(f"Parsing failed for {file_to_parse.name}: {result['error']}")
+                                    st.session_state.parsed = {"error": result['error'], "name": result.get('name', file_to_parse.name)}
+                                    st.session_state.resume_digest = None
+                                    st.session_state.full_text = result.get('full_text', "")
+                            except Exception as e:
+                                st.error(f"An unexpected error occurred during parsing: {e}")
             else:
                 st.info("No resume file is currently uploaded. Please upload a file above.")
 
@@ -620,6 +847,7 @@ def candidate_dashboard():
                 if st.button("Parse and Load Pasted Text", use_container_width=True):
                     with st.spinner("Parsing pasted text..."):
                         st.session_state.candidate_uploaded_resumes = []
+                        st.session_state.resume_digest = None
                         
                         try:
                             result = parse_and_store_resume(pasted_text, file_name_key='single_resume_candidate', source_type='text')
@@ -627,7 +855,6 @@ def candidate_dashboard():
                             if "error" not in result:
                                 st.session_state.parsed = result.get('parsed', {})
                                 st.session_state.full_text = result.get('full_text', "")
-                                st.session_state.excel_data = result.get('excel_data', None) 
                                 st.session_state.parsed['name'] = result.get('name', 'Pasted CV')
                                 clear_interview_state()
                                 st.success(f"✅ Successfully loaded and parsed **{st.session_state.parsed['name']}**.")
@@ -635,8 +862,6 @@ def candidate_dashboard():
                                 st.error(f"Parsing failed: {result['error']}")
                                 st.session_state.parsed = {"error": result['error'], "name": result.get('name', 'Pasted CV')}
                                 st.session_state.full_text = result.get('full_text', "")
-                        except NameError:
-                            st.error("Function 'parse_and_store_resume' not imported from 'app.py'. Check your setup.")
                         except Exception as e:
                             st.error(f"An unexpected error occurred during parsing: {e}")
             else:
@@ -659,94 +884,7 @@ def candidate_dashboard():
 
     # --- TAB 3: Interview Prep ---
     with tab3:
-        st.header("Interview Preparation Tools")
-        if not is_resume_parsed or "error" in st.session_state.get('parsed', {}):
-            st.warning("Please upload and successfully parse a resume first.")
-        else:
-            if 'iq_output' not in st.session_state: st.session_state.iq_output = ""
-            if 'interview_qa' not in st.session_state: st.session_state.interview_qa = [] 
-            if 'evaluation_report' not in st.session_state: st.session_state.evaluation_report = "" 
-            
-            st.subheader("1. Generate Interview Questions")
-            
-            question_section_options = ["skills","experience", "certifications", "projects", "education"]
-            section_choice = st.selectbox(
-                "Select Section", 
-                question_section_options, 
-                key='iq_section_c',
-                on_change=clear_interview_state 
-            )
-            
-            if st.button("Generate Interview Questions", key='iq_btn_c'):
-                with st.spinner("Generating questions..."):
-                    try:
-                        raw_questions_response = generate_interview_questions(st.session_state.parsed, section_choice)
-                        st.session_state.iq_output = raw_questions_response
-                        
-                        st.session_state.interview_qa = [] 
-                        st.session_state.evaluation_report = "" 
-                        
-                        # Simple parsing of question response
-                        q_list = []
-                        current_level = ""
-                        for line in raw_questions_response.splitlines():
-                            line = line.strip()
-                            if line.startswith('[') and line.endswith(']'):
-                                current_level = line.strip('[]')
-                            elif line.lower().startswith('q') and ':' in line:
-                                question_text = line[line.find(':') + 1:].strip()
-                                q_list.append({
-                                    "question": f"({current_level}) {question_text}",
-                                    "answer": "", "level": current_level
-                                })
-                                
-                        st.session_state.interview_qa = q_list
-                        st.success(f"Generated {len(q_list)} questions based on your **{section_choice}** section.")
-                        
-                    except NameError:
-                        st.error("Function 'generate_interview_questions' not imported from 'app.py'. Check your setup.")
-                        st.session_state.iq_output = "Error generating questions (Function Missing)."
-                        st.session_state.interview_qa = []
-                    except Exception as e:
-                        st.error(f"Error generating questions: {e}")
-                        st.session_state.iq_output = "Error generating questions."
-                        st.session_state.interview_qa = []
-
-            if st.session_state.get('interview_qa'):
-                st.markdown("---")
-                st.subheader("2. Practice and Record Answers")
-                
-                with st.form("interview_practice_form"):
-                    
-                    for i, qa_item in enumerate(st.session_state.interview_qa):
-                        st.markdown(f"**Question {i+1}:** {qa_item['question']}")
-                        answer = st.text_area(f"Your Answer for Q{i+1}", value=st.session_state.interview_qa[i]['answer'], height=100, key=f'answer_q_{i}', label_visibility='collapsed')
-                        st.session_state.interview_qa[i]['answer'] = answer 
-                        st.markdown("---") 
-                        
-                    submit_button = st.form_submit_button("Submit & Evaluate Answers", use_container_width=True)
-
-                    if submit_button:
-                        
-                        if all(item['answer'].strip() for item in st.session_state.interview_qa):
-                            with st.spinner("Sending answers to AI Evaluator..."):
-                                try:
-                                    report = evaluate_interview_answers(st.session_state.interview_qa, st.session_state.parsed)
-                                    st.session_state.evaluation_report = report
-                                    st.success("Evaluation complete! See the report below.")
-                                except NameError:
-                                    st.error("Function 'evaluate_interview_answers' not imported from 'app.py'. Check your setup.")
-                                    st.session_state.evaluation_report = "Evaluation failed (Function Missing)."
-                                except Exception as e:
-                                    st.error(f"Evaluation failed: {e}")
-                                    st.session_state.evaluation_report = f"Evaluation failed: {e}\n{traceback.format_exc()}"
-                        else:
-                            st.error("Please answer all generated questions before submitting.")
-                
-                if st.session_state.get('evaluation_report'):
-                    st.markdown("---")
-                    st.subheader("3. AI Evaluation Report")
-                    st.markdown(st.session_state.evaluation_report)
+        interview_prep_tab_content(is_resume_parsed)
 
     # --- TAB 4: JD Management (Candidate) ---
     with tab4:
@@ -762,26 +900,30 @@ def candidate_dashboard():
             url_list = st.text_area("Enter one or more URLs (comma separated)" if jd_type == "Multiple JD" else "Enter URL", key="url_list_candidate")
             if st.button("Add JD(s) from URL", key="add_jd_url_btn_candidate"):
                 if url_list:
-                    urls = [u.strip() for u in url_list.split(",")] if jd_type == "Multiple JD" else [url_list.strip()]
+                    urls = [u for u in (u.strip() for u in (url_list.split(",") if jd_type == "Multiple JD" else [url_list])) if u]
                     count = 0
-                    for url in urls:
-                        if not url: continue
-                        with st.spinner(f"Attempting JD extraction and metadata analysis for: {url}"):
-                            try:
-                                jd_text = extract_jd_from_linkedin_url(url)
-                                metadata = extract_jd_metadata(jd_text)
-                            except NameError:
-                                st.error("JD extraction functions not imported from 'app.py'. Check your setup.")
-                                break
-
-                        
-                        name_base = url.split('/jobs/view/')[-1].split('/')[0] if '/jobs/view/' in url else f"URL {count+1}"
-                        name = f"JD from URL: {name_base}" 
-                        if name in [item['name'] for item in st.session_state.candidate_jd_list]:
-                            name = f"JD from URL: {name_base} ({len(st.session_state.candidate_jd_list) + 1})" 
-
-                        st.session_state.candidate_jd_list.append({"name": name, "content": jd_text, **metadata})
-                        if not jd_text.startswith("[Error"): count += 1
+                    new_jds = {}
+                    existing_names = {item['name'] for item in st.session_state.candidate_jd_list}
+                    # One spinner and progress bar for the whole batch rather than a spinner per URL
+                    with st.spinner(f"Extracting and analysing {len(urls)} JD(s)..."):
+                        progress_bar = st.progress(0.0)
+                        for i, url in enumerate(urls, 1):
+                            progress_bar.progress((i - 1) / len(urls), text=f"Extracting JD {i} of {len(urls)}...")
+                            jd_text = extract_jd_from_linkedin_url(url)
+                            digest = content_digest(jd_text)
+                            if candidate_jd_known(digest, new_jds):
+                                st.warning(f"Duplicate JD skipped: {url}")
+                                continue
+                            metadata = extract_jd_metadata(jd_text)
+                            name_base = url.split('/jobs/view/')[-1].split('/')[0] if '/jobs/view/' in url else f"URL {count+1}"
+                            name = f"JD from URL: {name_base}" 
+                            if name in existing_names:
+                                name = f"JD from URL: {name_base} ({len(st.session_state.candidate_jd_list) + 1})" 
+
+                            new_jds[digest] = {"name": name, "content": jd_text, **metadata}
+                            if not jd_text.startswith("[Error"): count += 1
+                        progress_bar.empty()
+                    add_candidate_jds(new_jds)
                                 
                     if count > 0: st.success(f"✅ {count} JD(s) added successfully!")
                     elif urls: st.error("No JDs were added successfully. Check if the URL is valid and the extraction function is working.")
@@ -791,41 +933,40 @@ def candidate_dashboard():
             text_list = st.text_area("Paste one or more JD texts (separate by '---')" if jd_type == "Multiple JD" else "Paste JD text here", key="text_list_candidate")
             if st.button("Add JD(s) from Text", key="add_jd_text_btn_candidate"):
                 if text_list:
-                    texts = [t.strip() for t in text_list.split("---")] if jd_type == "Multiple JD" else [text_list.strip()]
-                    try:
+                    texts = split_pasted_jds(text_list, multiple=(jd_type == "Multiple JD"))
+                    new_jds = {}
+                    with st.spinner(f"Analysing {len(texts)} JD(s)..."):
+                        progress_bar = st.progress(0.0)
                         for i, text in enumerate(texts):
-                             if text:
-                                name_base = text.splitlines()[0].strip()
-                                if len(name_base) > 30: name_base = f"{name_base[:27]}..."
-                                if not name_base: name_base = f"Pasted JD {len(st.session_state.candidate_jd_list) + i + 1}"
-                                metadata = extract_jd_metadata(text)
-                                st.session_state.candidate_jd_list.append({"name": name_base, "content": text, **metadata})
-                        st.success(f"✅ {len(texts)} JD(s) added successfully!")
-                    except NameError:
-                        st.error("Function 'extract_jd_metadata' not imported from 'app.py'. Check your setup.")
-
+                            progress_bar.progress(i / len(texts), text=f"Analysing JD {i + 1} of {len(texts)}...")
+                            name_base = jd_title(text) or f"Pasted JD {len(st.session_state.candidate_jd_list) + i + 1}"
+                            digest = content_digest(text)
+                            if candidate_jd_known(digest, new_jds):
+                                st.warning(f"Duplicate JD skipped: {name_base}")
+                                continue
+                            metadata = extract_jd_metadata(text)
+                            new_jds[digest] = {"name": name_base, "content": text, **metadata}
+                        progress_bar.empty()
+                    add_candidate_jds(new_jds)
+                    if new_jds: st.success(f"✅ {len(new_jds)} JD(s) added successfully!")
         # Upload File
         elif method == "Upload File":
             uploaded_files = st.file_uploader("Upload JD file(s)", type=["pdf", "txt", "docx"], accept_multiple_files=(jd_type == "Multiple JD"), key="jd_file_uploader_candidate")
             if st.button("Add JD(s) from File", key="add_jd_file_btn_candidate"):
                 if uploaded_files is None: st.warning("Please upload file(s).")
                 files_to_process = uploaded_files if isinstance(uploaded_files, list) else ([uploaded_files] if uploaded_files else [])
-                count = 0
-                for file in files_to_process:
-                    if file:
-                        try:
-                            result = parse_and_store_resume(file, file_name_key='candidate_jd_temp', source_type='file')
-                            jd_text = result.get('full_text', "")
-                            if not jd_text.startswith("Error"):
-                                metadata = extract_jd_metadata(jd_text)
-                                st.session_state.candidate_jd_list.append({"name": file.name, "content": jd_text, **metadata})
-                                count += 1
-                            else: st.error(f"Error extracting content from {file.name}: {jd_text}")
-                        except NameError:
-                            st.error("Parsing/Metadata functions not imported from 'app.py'. Check your setup.")
-                            break
+                new_jds = {}
+                for file, jd_text in zip(files_to_process, extract_uploaded_files(files_to_process)):
+                    digest = content_digest(jd_text)
+                    if candidate_jd_known(digest, new_jds):
+                        st.warning(f"Duplicate JD skipped: {file.name}")
+                    elif not jd_text.startswith("Error"):
+                        metadata = extract_jd_metadata(jd_text)
+                        new_jds[digest] = {"name": file.name, "content": jd_text, **metadata}
+                    else: st.error(f"Error extracting content from {file.name}: {jd_text}")
+                add_candidate_jds(new_jds)
                             
-                if count > 0: st.success(f"✅ {count} JD(s) added successfully!")
+                if new_jds: st.success(f"✅ {len(new_jds)} JD(s) added successfully!")
                 elif uploaded_files: st.error("No valid JD files were uploaded or content extraction failed.")
 
 
@@ -836,7 +977,10 @@ def candidate_dashboard():
             with col_clear_button:
                 if st.button("🗑️ Clear All JDs", key="clear_jds_candidate", use_container_width=True, help="Removes all currently loaded JDs."):
                     st.session_state.candidate_jd_list = []
+                    st.session_state.candidate_jd_hashes = set()
+                    if st.session_state.get('user_id'): JDStore().clear(st.session_state.user_id)
                     st.session_state.candidate_match_results = []
+                    st.session_state.candidate_results_df = None
                     st.session_state.filtered_jds_display = [] 
                     st.rerun() 
 
@@ -851,98 +995,7 @@ def candidate_dashboard():
 
     # --- TAB 5: Batch JD Match (Candidate) ---
     with tab5:
-        st.header("🎯 Batch JD Match: Best Matches")
-        st.markdown("Compare your current resume against all saved job descriptions.")
-
-        if not is_resume_parsed:
-            st.warning("Please **upload and parse your resume** or **build your CV** first.")
-        elif not st.session_state.candidate_jd_list:
-            st.error("Please **add Job Descriptions** in the 'JD Management' tab before running batch analysis.")
-        else:
-
-            all_jd_names = [item['name'] for item in st.session_state.candidate_jd_list]
-            selected_jd_names = st.multiselect("Select Job Descriptions to Match Against", options=all_jd_names, default=all_jd_names, key='candidate_batch_jd_select')
-            jds_to_match = [jd_item for jd_item in st.session_state.candidate_jd_list if jd_item['name'] in selected_jd_names]
-            
-            if st.button(f"Run Match Analysis on {len(jds_to_match)} Selected JD(s)"):
-                st.session_state.candidate_match_results = []
-                if not jds_to_match:
-                    st.warning("Please select at least one Job Description to run the analysis.")
-                else:
-                    resume_name = st.session_state.parsed.get('name', 'Uploaded Resume')
-                    parsed_json = st.session_state.parsed
-                    results_with_score = []
-
-                    with st.spinner(f"Matching {resume_name}'s resume against {len(jds_to_match)} selected JD(s)..."):
-                        for jd_item in jds_to_match:
-                            jd_name = jd_item['name']
-                            jd_content = jd_item['content']
-                            try:
-                                fit_output = evaluate_jd_fit(jd_content, parsed_json)
-                                overall_score_match = re.search(r'Overall Fit Score:\s*[^\d]*(\d+)\s*/10', fit_output, re.IGNORECASE)
-                                section_analysis_match = re.search(r'--- Section Match Analysis ---\s*(.*?)\s*Strengths/Matches:', fit_output, re.DOTALL)
-                                skills_percent, experience_percent, education_percent = 'N/A', 'N/A', 'N/A'
-                                if section_analysis_match:
-                                    section_text = section_analysis_match.group(1)
-                                    skills_match = re.search(r'Skills Match:\s*\[?(\d+)%\]?', section_text, re.IGNORECASE)
-                                    experience_match = re.search(r'Experience Match:\s*\[?(\d+)%\]?', section_text, re.IGNORECASE)
-                                    education_match = re.search(r'Education Match:\s*\[?(\d+)%\]?', section_text, re.IGNORECASE)
-                                    if skills_match: skills_percent = skills_match.group(1)
-                                    if experience_match: experience_percent = experience_match.group(1)
-                                    if education_match: education_percent = education_match.group(1)
-                                overall_score = overall_score_match.group(1) if overall_score_match else 'N/A'
-                                results_with_score.append({
-                                    "jd_name": jd_name, "overall_score": overall_score,
-                                    "numeric_score": int(overall_score) if overall_score.isdigit() else -1,
-                                    "skills_percent": skills_percent, "experience_percent": experience_percent, 
-                                    "education_percent": education_percent, "full_analysis": fit_output
-                                })
-                            except NameError:
-                                st.error("Function 'evaluate_jd_fit' not imported from 'app.py'. Check your setup.")
-                                results_with_score.append({"jd_name": jd_name, "overall_score": "Error", "numeric_score": -1, "full_analysis": f"Error running analysis (Function Missing)"})
-                                break
-                            except Exception as e:
-                                results_with_score.append({"jd_name": jd_name, "overall_score": "Error", "numeric_score": -1, "full_analysis": f"Error running analysis: {e}\n{traceback.format_exc()}"})
-                                
-                        results_with_score.sort(key=lambda x: x['numeric_score'], reverse=True)
-                        current_rank = 1
-                        current_score = -1 
-                        for i, item in enumerate(results_with_score):
-                            if item['numeric_score'] > current_score:
-                                current_rank = i + 1
-                                current_score = item['numeric_score']
-                            item['rank'] = current_rank
-                            del item['numeric_score']
-                            
-                        st.session_state.candidate_match_results = results_with_score
-                        st.success("Batch analysis complete!")
-
-            if st.session_state.get('candidate_match_results'):
-                st.markdown("#### Match Results for Your Resume")
-                results_df = st.session_state.candidate_match_results
-                
-                display_data = []
-                for item in results_df:
-                    full_jd_item = next((jd for jd in st.session_state.candidate_jd_list if jd['name'] == item['jd_name']), {})
-                    display_data.append({
-                        "Rank": item.get("rank", "N/A"),
-                        "Job Description (Ranked)": item["jd_name"].replace("--- Simulated JD for: ", ""),
-                        "Role": full_jd_item.get('role', 'N/A'),
-                        "Job Type": full_jd_item.get('job_type', 'N/A'),
-                        "Fit Score (out of 10)": item["overall_score"],
-                        "Skills (%)": item.get("skills_percent", "N/A"),
-                        "Experience (%)": item.get("experience_percent", "N/A"), 
-                        "Education (%)": item.get("education_percent", "N/A"),   
-                    })
-
-                st.dataframe(display_data, use_container_width=True)
-
-                st.markdown("##### Detailed Reports")
-                for item in results_df:
-                    rank_display = f"Rank {item.get('rank', 'N/A')} | "
-                    header_text = f"{rank_display}Report for **{item['jd_name'].replace('--- Simulated JD for: ', '')}** (Score: **{item['overall_score']}/10** | S: **{item.get('skills_percent', 'N/A')}%** | E: **{item.get('experience_percent', 'N/A')}%** | Edu: **{item.get('education_percent', 'N/A')}%**)"
-                    with st.expander(header_text):
-                        st.markdown(item['full_analysis'])
+        batch_match_tab_content(is_resume_parsed)
 
     # --- TAB 6: Filter JD ---
     with tab6:
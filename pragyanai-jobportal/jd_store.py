@@ -0,0 +1,86 @@
+# jd_store.py
+import os
+import sqlite3
+import threading
+import zlib
+import orjson
+import streamlit as st
+from utils import content_digest
+
+# -------------------------
+# CONFIGURATION
+# -------------------------
+JD_STORE_PATH = os.getenv("JD_STORE_PATH", "jd_store.db")
+# JD texts longer than this are zlib-compressed before they are written
+JD_COMPRESS_MIN_CHARS = 2048
+# The cached connection is shared by every session's script thread; statements and commits are serialised
+_STORE_LOCK = threading.Lock()
+
+
+@st.cache_resource
+def init_connection(db_path):
+    """Returns the process-wide SQLite connection for `db_path`, creating the JD table on first use."""
+    conn = sqlite3.connect(db_path, check_same_thread=False)
+    conn.execute(
+        """CREATE TABLE IF NOT EXISTS jds (
+            user_id TEXT NOT NULL,
+            content_hash TEXT NOT NULL,
+            name TEXT NOT NULL,
+            content BLOB NOT NULL,
+            compressed INTEGER NOT NULL DEFAULT 0,
+            metadata BLOB,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (user_id, content_hash)
+        )"""
+    )
+    conn.commit()
+    return conn
+
+
+# -------------------------
+# Local JD Persistence (SQLite)
+# -------------------------
+class JDStore:
+    """Persists a user's curated JDs in a local SQLite file so they survive across sessions."""
+
+    def __init__(self, path=JD_STORE_PATH):
+        self.conn = init_connection(path)
+
+    def load(self, user_id):
+        """Returns the user's JDs as candidate_jd_list items, oldest first."""
+        with _STORE_LOCK:
+            rows = self.conn.execute(
+                "SELECT name, content, compressed, metadata FROM jds WHERE user_id = ? ORDER BY created_at, rowid",
+                (user_id,),
+            ).fetchall()
+        items = []
+        for name, content, compressed, metadata in rows:
+            text = zlib.decompress(content).decode("utf-8") if compressed else content.decode("utf-8")
+            items.append({"name": name, "content": text, **(orjson.loads(metadata) if metadata else {})})
+        return items
+
+    def _row(self, user_id, jd_item):
+        text = jd_item["content"]
+        data = text.encode("utf-8")
+        compressed = len(text) >= JD_COMPRESS_MIN_CHARS
+        if compressed:
+            data = zlib.compress(data)
+        metadata = {k: v for k, v in jd_item.items() if k not in ("name", "content")}
+        return (user_id, content_digest(text), jd_item["name"], data, int(compressed), orjson.dumps(metadata))
+
+    def insert_many(self, user_id, jd_items):
+        """Upserts several JD items in a single transaction; identical content for the same user is stored once."""
+        rows = [self._row(user_id, jd_item) for jd_item in jd_items]
+        with _STORE_LOCK:
+            self.conn.executemany(
+                """INSERT INTO jds (user_id, content_hash, name, content, compressed, metadata)
+                   VALUES (?, ?, ?, ?, ?, ?)
+                   ON CONFLICT(user_id, content_hash) DO UPDATE SET name = excluded.name, metadata = excluded.metadata""",
+                rows,
+            )
+            self.conn.commit()
+
+    def clear(self, user_id):
+        with _STORE_LOCK:
+            self.conn.execute("DELETE FROM jds WHERE user_id = ?", (user_id,))
+            self.conn.commit()
@@ -1,7 +1,7 @@
 # app.py
 
 import streamlit as st
-from utils import go_to, clear_interview_state
+from utils import go_to, clear_interview_state, init_session_defaults, user_store_key
 from admin_dashboard import admin_dashboard
 from candidate_dashboard import candidate_dashboard
 from hiring_dashboard import hiring_dashboard
@@ -10,6 +10,31 @@ from datetime import date
 # -------------------------
 # Main App Initialization
 # -------------------------
+# Session state every page relies on; missing keys are filled in once at the top of each run
+SESSION_DEFAULTS = {
+    'page': "login",
+    # AI features
+    'parsed': {},
+    'full_text': "",
+    'qa_answer': "",
+    'iq_output': "",
+    'jd_fit_output': "",
+    # Admin Dashboard
+    'admin_jd_list': [],
+    'resumes_to_analyze': [],
+    'admin_match_results': [],
+    'resume_statuses': {},
+    'vendors': [],
+    'vendor_statuses': {},
+    # Candidate Dashboard
+    'candidate_jd_list': [],
+    'candidate_match_results': [],
+    'candidate_uploaded_resumes': [],
+    # Interview Prep
+    'interview_qa': [],
+    'evaluation_report': "",
+}
+
 def login_page():
     st.title("🌐 PragyanAI Job Portal")
     st.header("Login")
@@ -30,15 +55,19 @@ def login_page():
         if email and password:
             if selected_role == "Select Role":
                 st.error("Please select your role before logging in.")
-            elif selected_role == "Admin Dashboard":
-                st.success("Login successful! Redirecting to Admin Dashboard.")
-                go_to("admin_dashboard")
-            elif selected_role == "Candidate Dashboard":
-                st.success("Login successful! Redirecting to Candidate Dashboard.")
-                go_to("candidate_dashboard")
-            elif selected_role == "Hiring Company Dashboard":
-                st.success("Login successful! Redirecting to Hiring Company Dashboard.")
-                go_to("hiring_dashboard")
+            else:
+                # The identity is recorded only once the login goes through
+                st.session_state.user_email = email.strip().lower()
+                st.session_state.user_id = user_store_key(st.session_state.user_email, password)
+                if selected_role == "Admin Dashboard":
+                    st.success("Login successful! Redirecting to Admin Dashboard.")
+                    go_to("admin_dashboard")
+                elif selected_role == "Candidate Dashboard":
+                    st.success("Login successful! Redirecting to Candidate Dashboard.")
+                    go_to("candidate_dashboard")
+                elif selected_role == "Hiring Company Dashboard":
+                    st.success("Login successful! Redirecting to Hiring Company Dashboard.")
+                    go_to("hiring_dashboard")
         else:
             st.error("Please enter both email and password")
 
@@ -68,37 +97,7 @@ def main():
     st.set_page_config(layout="wide", page_title="PragyanAI Job Portal")
 
     # --- Session State Initialization ---
-    if 'page' not in st.session_state: st.session_state.page = "login"
-    
-    # Initialize session state for AI features (Defensive Initialization)
-    if 'parsed' not in st.session_state: st.session_state.parsed = {}
-    if 'full_text' not in st.session_state: st.session_state.full_text = ""
-    if 'excel_data' not in st.session_state: st.session_state.excel_data = None
-    if 'qa_answer' not in st.session_state: st.session_state.qa_answer = ""
-    if 'iq_output' not in st.session_state: st.session_state.iq_output = ""
-    if 'jd_fit_output' not in st.session_state: st.session_state.jd_fit_output = ""
-        
-        # Admin Dashboard specific lists
-    if 'admin_jd_list' not in st.session_state: st.session_state.admin_jd_list = [] 
-    if 'resumes_to_analyze' not in st.session_state: st.session_state.resumes_to_analyze = [] 
-    if 'admin_match_results' not in st.session_state: st.session_state.admin_match_results = [] 
-    if 'resume_statuses' not in st.session_state: st.session_state.resume_statuses = {} 
-        
-        # Vendor State Init
-    if 'vendors' not in st.session_state: st.session_state.vendors = []
-    if 'vendor_statuses' not in st.session_state: st.session_state.vendor_statuses = {}
-        
-        # Candidate Dashboard specific lists
-    if 'candidate_jd_list' not in st.session_state: st.session_state.candidate_jd_list = []
-    if 'candidate_match_results' not in st.session_state: st.session_state.candidate_match_results = []
-    
-    # Resume Parsing Upload State
-    if 'candidate_uploaded_resumes' not in st.session_state: st.session_state.candidate_uploaded_resumes = []
-    
-    # Interview Prep Q&A State
-    if 'interview_qa' not in st.session_state: st.session_state.interview_qa = [] 
-    if 'evaluation_report' not in st.session_state: st.session_state.evaluation_report = ""
-
+    init_session_defaults(SESSION_DEFAULTS)
 
     # --- Page Routing ---
     if st.session_state.page == "login":
@@ -1,18 +1,15 @@
 # mongodb_manager.py
 import os
-import json
-import tempfile
-import openpyxl
-import pdfplumber
-import docx
 import re
 import traceback
 from datetime import datetime
-from pymongo import MongoClient
+from pymongo import MongoClient, UpdateOne, ReturnDocument
+from pymongo.errors import OperationFailure
 from bson.objectid import ObjectId
 from dotenv import load_dotenv
 import streamlit as st
 from groq import Groq
+from utils import content_digest
 
 # -------------------------
 # CONFIGURATION & API SETUP
@@ -32,6 +29,34 @@ if not MONGODB_URI:
 client = Groq(api_key=GROQ_API_KEY)
 GROQ_MODEL = "llama-3.1-8b-instant"
 
+# Connection pool shared by every session (init_connection is a cached resource, so the
+# process holds exactly one MongoClient). Wire compression favours zstd when the zstandard
+# package is installed; pymongo drops an unavailable compressor and falls back to zlib.
+MONGO_CLIENT_OPTIONS = {
+    "maxPoolSize": 50,
+    "minPoolSize": 5,
+    "serverSelectionTimeoutMS": 3000,
+    "compressors": "zstd,zlib",
+}
+
+# Resumes per page for paginated listings
+RESUMES_PAGE_SIZE = 25
+# Seconds a listing (resumes, vendors, JDs, match results) is served from the Streamlit cache; writes through this
+# manager invalidate it immediately, so the TTL only bounds staleness from other writers
+LISTING_CACHE_TTL = 30
+
+
+@st.cache_resource(ttl=3600)
+def init_connection(mongo_uri):
+    """
+    Returns the process-wide MongoClient for `mongo_uri`, shared across reruns, sessions and
+    DatabaseManager instances. Errors propagate, so a failed connect is retried rather than cached.
+    """
+    client = MongoClient(mongo_uri, **MONGO_CLIENT_OPTIONS)
+    client.admin.command("ping")
+    DatabaseManager.ensure_indexes(client.get_default_database())
+    return client
+
 
 # -------------------------
 # MongoDB Database Manager
@@ -40,87 +65,210 @@ class DatabaseManager:
     """Handles connection and CRUD operations for MongoDB."""
 
     def __init__(self, uri):
-        self.client = self.init_connection(uri)
-        self.db = self.client.get_default_database() if self.client else None
-
-    @st.cache_resource(ttl=3600)
-    def init_connection(_self, mongo_uri):
         try:
-            client = MongoClient(mongo_uri, serverSelectionTimeoutMS=5500)
-            client.admin.command("ping")
-            client.get_default_database()
-            return client
+            self.client = init_connection(uri)
         except Exception as e:
             st.error(f"❌ MongoDB Connection Error: {e}")
-            return None
+            self.client = None
+        self.db = self.client.get_default_database() if self.client else None
+
+    @staticmethod
+    def ensure_indexes(db):
+        """Creates the indexes behind the lookups and sorts below (no-op when they already exist)."""
+        resumes = db["admin_resumes"]
+        # Unique keys back the single-round-trip upserts in save_resume/save_vendor
+        for col in ["admin_resumes", "vendors"]:
+            try:
+                db[col].create_index("name", unique=True)
+            except OperationFailure as e:
+                st.warning(f"Could not create unique name index on '{col}' (existing duplicates?): {e}")
+        resumes.create_index([("status", 1), ("created_at", -1)])
+        resumes.create_index([("created_at", -1)])
+        for col in ["admin_jds", "candidate_jds", "admin_match_results", "candidate_match_results"]:
+            db[col].create_index([("created_at", -1)])
+        for col in ["admin_jds", "candidate_jds"]:
+            DatabaseManager.backfill_content_hashes(db[col])
+            try:
+                db[col].create_index([("name", 1), ("content_hash", 1)], unique=True)
+            except OperationFailure as e:
+                st.warning(f"Could not create unique (name, content_hash) index on '{col}' (existing duplicates?): {e}")
+
+    @staticmethod
+    def backfill_content_hashes(collection):
+        """Sets content_hash on JDs saved before it existed, so save_jd(s) upserts match them."""
+        operations = [
+            UpdateOne({"_id": doc["_id"]}, {"$set": {"content_hash": content_digest(doc.get("content", ""))}})
+            for doc in collection.find({"content_hash": {"$exists": False}}, {"content": 1})
+        ]
+        if operations:
+            collection.bulk_write(operations, ordered=False)
 
     def is_connected(self):
         return self.client is not None and self.db is not None
 
+    @staticmethod
+    def clear_listing_caches():
+        """Drops cached listings so the next read goes back to MongoDB."""
+        DatabaseManager.get_resumes.clear()
+        DatabaseManager.count_resumes.clear()
+        DatabaseManager.get_vendors.clear()
+        DatabaseManager.get_jds.clear()
+        DatabaseManager.get_match_results.clear()
+
     # --- JD Management ---
+    def _upsert(self, collection, key, data):
+        """Updates or inserts the document matching `key` in one round trip; returns its _id."""
+        now = datetime.utcnow()
+        data["updated_at"] = now
+        data.pop("created_at", None)
+        doc = collection.find_one_and_update(
+            key,
+            {"$set": data, "$setOnInsert": {"created_at": now}},
+            projection={"_id": 1},
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        return doc["_id"]
+
     def save_jd(self, jd_data, user_role):
         if not self.is_connected():
             return None
         collection = self.db[f"{user_role}_jds"]
-        jd_data["updated_at"] = datetime.utcnow()
-        existing = collection.find_one({"name": jd_data["name"], "content": jd_data["content"]})
-        if existing:
-            collection.update_one({"_id": existing["_id"]}, {"$set": jd_data})
-            return existing["_id"]
-        jd_data["created_at"] = datetime.utcnow()
-        return collection.insert_one(jd_data).inserted_id
-
-    def get_jds(self, user_role):
-        if not self.is_connected():
+        # Match on a short digest of the content rather than the multi-KB text itself
+        jd_data["content_hash"] = content_digest(jd_data["content"])
+        jd_id = self._upsert(collection, {"name": jd_data["name"], "content_hash": jd_data["content_hash"]}, jd_data)
+        DatabaseManager.get_jds.clear()
+        return jd_id
+
+    def save_jds(self, jd_items, user_role):
+        """Upserts several JDs with one unordered bulk write; returns the number inserted or changed."""
+        if not self.is_connected() or not jd_items:
+            return 0
+        now = datetime.utcnow()
+        operations = []
+        for jd_data in jd_items:
+            jd_data["content_hash"] = content_digest(jd_data["content"])
+            jd_data["updated_at"] = now
+            jd_data.pop("created_at", None)
+            operations.append(UpdateOne(
+                {"name": jd_data["name"], "content_hash": jd_data["content_hash"]},
+                {"$set": jd_data, "$setOnInsert": {"created_at": now}},
+                upsert=True,
+            ))
+        result = self.db[f"{user_role}_jds"].bulk_write(operations, ordered=False)
+        DatabaseManager.get_jds.clear()
+        return result.upserted_count + result.modified_count
+
+    @st.cache_data(ttl=LISTING_CACHE_TTL, show_spinner=False)
+    def get_jds(_self, user_role, include_content=False):
+        """Lists JDs, newest first. The JD text itself is left out unless include_content is set."""
+        if not _self.is_connected():
             return []
-        collection = self.db[f"{user_role}_jds"]
-        items = list(collection.find({}).sort("created_at", -1))
+        collection = _self.db[f"{user_role}_jds"]
+        projection = None if include_content else {"content": 0}
+        items = list(collection.find({}, projection).sort("created_at", -1))
         for i in items:
             i["_id"] = str(i["_id"])
         return items
 
+    def get_jd(self, jd_id, user_role):
+        """Fetches one full JD document (including content) by id."""
+        if not self.is_connected():
+            return None
+        item = self.db[f"{user_role}_jds"].find_one({"_id": ObjectId(jd_id)})
+        if item:
+            item["_id"] = str(item["_id"])
+        return item
+
     # --- Resume Management ---
     def save_resume(self, resume_data):
         if not self.is_connected():
             return None
-        col = self.db["admin_resumes"]
-        resume_data["updated_at"] = datetime.utcnow()
         resume_data.setdefault("status", "Pending")
-        existing = col.find_one({"name": resume_data["name"]})
-        if existing:
-            col.update_one({"_id": existing["_id"]}, {"$set": resume_data})
-            return existing["_id"]
-        resume_data["created_at"] = datetime.utcnow()
-        return col.insert_one(resume_data).inserted_id
-
-    def get_resumes(self):
-        if not self.is_connected():
+        resume_id = self._upsert(self.db["admin_resumes"], {"name": resume_data["name"]}, resume_data)
+        self.clear_listing_caches()
+        return resume_id
+
+    def save_resumes(self, resumes):
+        """Upserts a batch of resumes (matched by name, like save_resume) in one unordered bulk write."""
+        if not self.is_connected() or not resumes:
+            return 0
+        now = datetime.utcnow()
+        operations = []
+        for resume_data in resumes:
+            resume_data["updated_at"] = now
+            resume_data.setdefault("status", "Pending")
+            resume_data.pop("created_at", None)
+            operations.append(UpdateOne(
+                {"name": resume_data["name"]},
+                {"$set": resume_data, "$setOnInsert": {"created_at": now}},
+                upsert=True,
+            ))
+        result = self.db["admin_resumes"].bulk_write(operations, ordered=False)
+        self.clear_listing_caches()
+        return result.upserted_count + result.modified_count
+
+    def update_resume_statuses(self, resume_ids, new_status, approver=None):
+        """Sets the same status on several resumes with one unordered bulk write; returns the number changed."""
+        if not self.is_connected() or not resume_ids:
+            return 0
+        update = {"status": new_status, "updated_at": datetime.utcnow()}
+        if approver:
+            update["status_updated_by"] = approver
+        operations = [UpdateOne({"_id": ObjectId(resume_id)}, {"$set": update}) for resume_id in resume_ids]
+        result = self.db["admin_resumes"].bulk_write(operations, ordered=False)
+        self.clear_listing_caches()
+        return result.modified_count
+
+    @st.cache_data(ttl=LISTING_CACHE_TTL, show_spinner=False)
+    def get_resumes(_self, include_content=False, page=None, page_size=RESUMES_PAGE_SIZE, status=None):
+        """
+        Lists resumes, newest first. The bulky full_text/parsed fields are left out unless include_content is set.
+        Pass a 0-based `page` to fetch only that page of `page_size` resumes, and `status` to filter on it.
+        """
+        if not _self.is_connected():
             return []
-        col = self.db["admin_resumes"]
-        items = list(col.find({}).sort("created_at", -1))
+        col = _self.db["admin_resumes"]
+        projection = None if include_content else {"full_text": 0, "parsed": 0}
+        cursor = col.find({"status": status} if status else {}, projection).sort("created_at", -1)
+        if page is not None:
+            cursor = cursor.skip(page * page_size).limit(page_size)
+        items = list(cursor)
         for i in items:
             i["_id"] = str(i["_id"])
             i.setdefault("status", "Pending")
         return items
 
+    @st.cache_data(ttl=LISTING_CACHE_TTL, show_spinner=False)
+    def count_resumes(_self, status=None):
+        if not _self.is_connected():
+            return 0
+        return _self.db["admin_resumes"].count_documents({"status": status} if status else {})
+
+    def get_resume(self, resume_id):
+        """Fetches one full resume document (including full_text/parsed) by id."""
+        if not self.is_connected():
+            return None
+        item = self.db["admin_resumes"].find_one({"_id": ObjectId(resume_id)})
+        if item:
+            item["_id"] = str(item["_id"])
+            item.setdefault("status", "Pending")
+        return item
+
     # --- Vendor Management ---
     def save_vendor(self, vendor_data):
         if not self.is_connected():
             return None
-        col = self.db["vendors"]
-        vendor_data["updated_at"] = datetime.utcnow()
         vendor_data.setdefault("status", "Pending")
-        existing = col.find_one({"name": vendor_data["name"]})
-        if existing:
-            col.update_one({"_id": existing["_id"]}, {"$set": vendor_data})
-            return existing["_id"]
-        vendor_data["created_at"] = datetime.utcnow()
-        return col.insert_one(vendor_data).inserted_id
-
-    def get_vendors(self):
-        if not self.is_connected():
+        vendor_id = self._upsert(self.db["vendors"], {"name": vendor_data["name"]}, vendor_data)
+        self.clear_listing_caches()
+        return vendor_id
+
+    @st.cache_data(ttl=LISTING_CACHE_TTL, show_spinner=False)
+    def get_vendors(_self):
+        if not _self.is_connected():
             return []
-        col = self.db["vendors"]
+        col = _self.db["vendors"]
         items = list(col.find({}).sort("created_at", -1))
         for i in items:
             i["_id"] = str(i["_id"])
@@ -132,12 +280,15 @@ class DatabaseManager:
         if not self.is_connected():
             return None
         data["created_at"] = datetime.utcnow()
-        return self.db[f"{role}_match_results"].insert_one(data).inserted_id
+        result_id = self.db[f"{role}_match_results"].insert_one(data).inserted_id
+        DatabaseManager.get_match_results.clear()
+        return result_id
 
-    def get_match_results(self, role):
-        if not self.is_connected():
+    @st.cache_data(ttl=LISTING_CACHE_TTL, show_spinner=False)
+    def get_match_results(_self, role):
+        if not _self.is_connected():
             return []
-        results = list(self.db[f"{role}_match_results"].find({}).sort("created_at", -1).limit(50))
+        results = list(_self.db[f"{role}_match_results"].find({}).sort("created_at", -1).limit(50))
         for r in results:
             r["_id"] = str(r["_id"])
             if "created_at" in r:
@@ -189,4 +340,5 @@ class DatabaseManager:
             "platform_metrics",
         ]:
             self.db[col].drop()
+        self.clear_listing_caches()
 
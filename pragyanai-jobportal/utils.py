@@ -2,12 +2,18 @@
 
 import streamlit as st
 import os
-import pdfplumber
-import docx
-import openpyxl
-import json
-import tempfile
-from groq import Groq
+import io
+import orjson
+import hashlib
+import asyncio
+import math
+import copy
+import sqlite3
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+import httpx
+from groq import Groq, AsyncGroq
 import re
 from dotenv import load_dotenv 
 from streamlit.runtime.uploaded_file_manager import UploadedFile
@@ -18,12 +24,35 @@ import traceback
 # -------------------------
 
 GROQ_MODEL = "llama-3.1-8b-instant"
+# Model per call type: extraction and conversational answers run on the fast 8B model; fit
+# scoring and answer evaluation, which have to weigh evidence against criteria, get the 70B model.
+MODEL_TIERS = {
+    "parse": GROQ_MODEL,
+    "qa": GROQ_MODEL,
+    "evaluate": "llama-3.3-70b-versatile",
+}
 
 # Options for LLM functions
 section_options = ["name", "email", "phone", "skills", "education", "experience", "certifications", "projects", "strength", "personal_details", "github", "linkedin", "full resume"]
 question_section_options = ["skills","experience", "certifications", "projects", "education"] 
 answer_types = [("Point-wise", "points"), ("Detailed", "detailed"), ("Key Points", "key")]
 
+# Prompt size bounds (characters; roughly 4 characters per token). Text past the
+# bound is cut so very long documents cannot blow up prefill time or the context window.
+MAX_RESUME_CHARS = 12000
+MAX_JD_CHARS = 6000
+# Upper bound on raw resume text sent with a Q&A question the parsed JSON cannot answer
+QA_FULL_TEXT_MAX_CHARS = 4000
+
+# Output token caps per call type. Generation stops at the cap, so each sits just above a typical
+# answer; the parse cap leaves room for long experience/project lists so the JSON isn't cut off.
+RESUME_PARSE_MAX_TOKENS = 2048
+JD_FIT_ITEM_MAX_TOKENS = 350  # per resume/JD in JSON-mode fit requests
+QA_MAX_TOKENS = 512
+INTERVIEW_QUESTIONS_MAX_TOKENS = 600
+INTERVIEW_EVALUATION_MAX_TOKENS = 1500
+JD_METADATA_MAX_TOKENS = 256
+
 
 # Load environment variables from .env file
 load_dotenv()
@@ -31,9 +60,16 @@ load_dotenv()
 # Ensure GROQ_API_KEY is defined in your environment or .env file
 GROQ_API_KEY = os.getenv('GROQ_API_KEY')
 
+# Shared HTTP/2 connection pool settings for all Groq traffic
+GROQ_HTTP_LIMITS = httpx.Limits(max_connections=32, max_keepalive_connections=16)
+GROQ_HTTP_TIMEOUT = httpx.Timeout(60.0, connect=5.0)
+
 # Initialize Groq Client
 if GROQ_API_KEY:
-    client = Groq(api_key=GROQ_API_KEY)
+    client = Groq(
+        api_key=GROQ_API_KEY,
+        http_client=httpx.Client(http2=True, limits=GROQ_HTTP_LIMITS, timeout=GROQ_HTTP_TIMEOUT)
+    )
 else:
     # A placeholder client or simple exit for environments where Streamlit runs
     # This prevents the app from crashing on import, though LLM calls will fail.
@@ -44,6 +80,17 @@ else:
             raise Exception("GROQ_API_KEY not set. Cannot run LLM.")
     client = DummyGroqClient()
 
+def _async_groq_client():
+    """
+    Returns a new AsyncGroq client with its own HTTP/2 pool. Open it with `async with` inside the
+    coroutine `asyncio.run` drives: pooled connections belong to the event loop that opened them,
+    and every `asyncio.run` starts a fresh loop and closes it on return.
+    """
+    return AsyncGroq(
+        api_key=GROQ_API_KEY,
+        http_client=httpx.AsyncClient(http2=True, limits=GROQ_HTTP_LIMITS, timeout=GROQ_HTTP_TIMEOUT)
+    )
+
 # -------------------------
 # Utility: Navigation Manager
 # -------------------------
@@ -51,6 +98,22 @@ def go_to(page_name):
     """Changes the current page in Streamlit's session state."""
     st.session_state.page = page_name
 
+def init_session_defaults(defaults):
+    """Sets every missing session-state key to a fresh copy of its default (so sessions never share a list/dict)."""
+    for key, default in defaults.items():
+        if key not in st.session_state:
+            st.session_state[key] = copy.copy(default)
+
+# PBKDF2 work factor for the key a user's locally persisted data is stored under
+USER_KEY_ITERATIONS = 200_000
+
+def user_store_key(email, password):
+    """
+    Derives the key a user's locally persisted data (e.g. saved JDs) is stored under from their
+    login email and password, so knowing someone's email alone does not reach their data.
+    """
+    return hashlib.pbkdf2_hmac('sha256', password.encode('utf-8'), email.encode('utf-8'), USER_KEY_ITERATIONS).hex()
+
 def clear_interview_state():
     """Clears all generated questions, answers, and the evaluation report."""
     st.session_state.interview_qa = []
@@ -62,40 +125,36 @@ def clear_interview_state():
 # CORE LOGIC: FILE HANDLING AND EXTRACTION
 # -------------------------
 
-def get_file_type(file_path):
-    """Identifies the file type based on its extension."""
-    ext = os.path.splitext(file_path)[1].lower()
-    if ext == '.pdf':
-        return 'pdf'
-    elif ext == '.docx':
-        return 'docx'
-    else:
-        return 'txt' 
+# Upload extension -> extract_content file type; anything else is read as plain text
+_EXT_TO_FILE_TYPE = {'.pdf': 'pdf', '.docx': 'docx', '.txt': 'txt'}
 
-def extract_content(file_type, file_path):
-    """Extracts text content from PDF or DOCX files using robust libraries."""
+def get_file_type(file_name):
+    """Identifies the file type from the file name's extension (no file access)."""
+    return _EXT_TO_FILE_TYPE.get(os.path.splitext(file_name)[1].lower(), 'txt')
+
+def extract_content(file_type, data):
+    """Extracts text content from in-memory PDF, DOCX or TXT file bytes using robust libraries."""
     try:
+        # Parser libraries are imported on first use to keep them off the app's cold-start path
         if file_type == 'pdf':
-            text = ''
-            with pdfplumber.open(file_path) as pdf:
-                for page in pdf.pages:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text += page_text + '\n'
+            import fitz
+            with fitz.open(stream=data, filetype="pdf") as doc:
+                page_texts = (page.get_text("text") for page in doc)
+                text = "\n".join(page_text for page_text in page_texts if page_text)
             if not text.strip():
                 return "Error: PDF extraction failed. The file might be a scanned image without searchable text or is empty."
             return text
         
         elif file_type == 'docx':
-            doc = docx.Document(file_path)
-            text = '\n'.join([para.text for para in doc.paragraphs])
+            import docx
+            doc = docx.Document(io.BytesIO(data))
+            text = '\n'.join(para.text for para in doc.paragraphs)
             if not text.strip():
                 return "Error: DOCX content extraction failed. The file appears to be empty."
             return text
         
         elif file_type == 'txt':
-            with open(file_path, 'r', encoding='utf-8') as f:
-                return f.read()
+            return data.decode('utf-8', errors='replace')
         
         else:
             return "Error: Unsupported file type."
@@ -103,17 +162,114 @@ def extract_content(file_type, file_path):
     except Exception as e:
         return f"Fatal Extraction Error: Failed to read file content. Error details: {e}"
 
+EXTRACTED_TEXT_CACHE_MAX_ENTRIES = 256
+
+@st.cache_resource
+def _extracted_text_cache():
+    """Process-wide store of successfully extracted upload text keyed by file content digest."""
+    return {}
+
+def extract_uploaded_files(uploaded_files, max_workers=8, digests=None):
+    """
+    Extracts text from several uploaded files concurrently (the PDF/DOCX parsers do their heavy
+    lifting outside the GIL). Returns one text or error string per file, in input order.
+    Files seen before (same bytes) are served from the extracted-text cache; callers that already
+    hashed the files can pass their `content_digest`s to skip rehashing.
+    """
+    if not uploaded_files:
+        return []
+    # Cache lookups and buffer reads happen on the calling thread; workers only see plain bytes
+    cache = _extracted_text_cache()
+    if digests is None:
+        digests = [content_digest(f.getbuffer()) for f in uploaded_files]
+    texts = [cache.get(digest) for digest in digests]
+    misses = [i for i, text in enumerate(texts) if text is None]
+    if misses:
+        payloads = [(get_file_type(uploaded_files[i].name), uploaded_files[i].getvalue()) for i in misses]
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(payloads))) as executor:
+            for i, text in zip(misses, executor.map(lambda payload: extract_content(*payload), payloads)):
+                texts[i] = text
+                if not text.startswith(("Error", "Fatal Extraction Error")):
+                    _remember(cache, digests[i], text, EXTRACTED_TEXT_CACHE_MAX_ENTRIES)
+    return texts
+
 # -------------------------
 # LLM & Extraction Functions
 # -------------------------
 
-@st.cache_data(show_spinner="Analyzing content with Groq LLM...")
-def parse_with_llm(text, return_type='json'):
-    """Sends resume text to the LLM for structured information extraction."""
-    if text.startswith("Error"):
-        return {"error": text, "raw_output": ""}
+def to_pretty_json(data):
+    """Serializes data as 2-space indented JSON text for prompts and downloads."""
+    return orjson.dumps(data, option=orjson.OPT_INDENT_2, default=str).decode()
+
+def content_digest(data):
+    """Returns a short, stable fingerprint for file bytes or text, used as a cache key."""
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+def json_digest(data):
+    """Fingerprint of JSON-serialisable data, independent of dict key order."""
+    return content_digest(orjson.dumps(data, option=orjson.OPT_SORT_KEYS, default=str))
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def cached_pretty_json(data_hash, _data):
+    """to_pretty_json memoised by json_digest, so reruns don't re-serialise unchanged data."""
+    return to_pretty_json(_data)
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def cached_excel(data_hash, _data):
+    """dump_to_excel memoised by json_digest; built only when the user asks for the export."""
+    return dump_to_excel(_data)
+
+RESUME_CACHE_MAX_ENTRIES = 256
+
+@st.cache_resource
+def _resume_cache():
+    """Process-wide store of extracted text and parsed JSON keyed by upload content digest."""
+    return {}
+
+def _remember_resume(digest, parsed, text):
+    """Stores a successful parse in the bounded resume cache and returns the entry."""
+    entry = {"parsed": parsed, "full_text": text}
+    _remember(_resume_cache(), digest, entry, RESUME_CACHE_MAX_ENTRIES)
+    return entry
+
+# Persistent (cross-restart) store of successful resume parses, keyed by text + model + prompt version.
+# Bump RESUME_PARSE_PROMPT_VERSION whenever `_resume_parse_prompt` changes meaningfully.
+PARSE_CACHE_PATH = os.getenv("PARSE_CACHE_PATH", "llm_cache.db")
+RESUME_PARSE_PROMPT_VERSION = "3"
+# The cached connection is shared by every session's script thread; statements and commits are serialised
+_PARSE_CACHE_LOCK = threading.Lock()
+
+@st.cache_resource
+def _parse_cache_db():
+    conn = sqlite3.connect(PARSE_CACHE_PATH, check_same_thread=False)
+    conn.execute("CREATE TABLE IF NOT EXISTS parsed_resumes (key TEXT PRIMARY KEY, parsed BLOB NOT NULL)")
+    conn.commit()
+    return conn
+
+def _parse_cache_key(text):
+    return content_digest(f"{MODEL_TIERS['parse']}\0{RESUME_PARSE_PROMPT_VERSION}\0{text}")
+
+def load_cached_parse(text):
+    """Returns the stored parse for this resume text, or None."""
+    key = _parse_cache_key(text)
+    with _PARSE_CACHE_LOCK:
+        row = _parse_cache_db().execute("SELECT parsed FROM parsed_resumes WHERE key = ?", (key,)).fetchone()
+    return orjson.loads(row[0]) if row else None
+
+def store_cached_parse(text, parsed):
+    """Persists a successful parse; error results are never stored."""
+    if not parsed or "error" in parsed:
+        return
+    row = (_parse_cache_key(text), orjson.dumps(parsed, default=str))
+    conn = _parse_cache_db()
+    with _PARSE_CACHE_LOCK:
+        conn.execute("INSERT OR REPLACE INTO parsed_resumes (key, parsed) VALUES (?, ?)", row)
+        conn.commit()
 
-    prompt = f"""Extract the following information from the resume in structured JSON.
+def _resume_parse_prompt(text):
+    return f"""Extract the following information from the resume in structured JSON.
     Ensure all relevant details for each category are captured.
     - Name, - Email, - Phone, - Skills, - Education (list of degrees/institutions/dates), 
     - Experience (list of job roles/companies/dates/responsibilities), - Certifications (list), 
@@ -121,41 +277,56 @@ def parse_with_llm(text, return_type='json'):
     - Personal Details (e.g., address, date of birth, nationality), - Github (URL), - LinkedIn (URL)
     
     Resume Text:
-    {text}
-    
-    Provide the output strictly as a JSON object.
+    {compact_whitespace(text)[:MAX_RESUME_CHARS]}
     """
-    content = ""
-    try:
-        response = client.chat.completions.create(
-            model=GROQ_MODEL,
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.2
-        )
-        content = response.choices[0].message.content.strip()
 
-        # Robust JSON extraction
-        json_str = content
-        if json_str.startswith('```json'):
-            json_str = json_str[len('```json'):]
-        if json_str.endswith('```'):
-            json_str = json_str[:-len('```')]
-        json_str = json_str.strip()
+def _decode_parsed_resume(content):
+    """Decodes the JSON-mode resume parse; malformed output becomes an error dict."""
+    try:
+        return orjson.loads(content)
+    except orjson.JSONDecodeError as e:
+        error_msg = f"JSON decoding error from LLM. LLM returned malformed JSON. Error: {e}"
+        return {"error": error_msg, "raw_output": content}
 
-        json_start = json_str.find('{')
-        json_end = json_str.rfind('}') + 1
+async def _parse_resume_async(aclient, text):
+    """Async counterpart of the JSON branch of `parse_with_llm` using an AsyncGroq client."""
+    try:
+        response = await aclient.chat.completions.create(
+            model=MODEL_TIERS["parse"],
+            messages=[{"role": "user", "content": _resume_parse_prompt(text)}],
+            response_format={"type": "json_object"},
+            temperature=0,
+            max_tokens=RESUME_PARSE_MAX_TOKENS
+        )
+    except Exception as e:
+        return {"error": f"LLM API interaction error: {e}", "raw_output": "No LLM response due to API error."}
+    return _decode_parsed_resume(response.choices[0].message.content)
 
-        if json_start != -1 and json_end != -1 and json_end > json_start:
-            json_str = json_str[json_start:json_end]
+def parse_with_llm(text, return_type='json'):
+    """Sends resume text to the LLM for structured information extraction.
 
-        parsed = json.loads(json_str)
+    Successful parses are served from the SQLite parse cache; failures are never cached, so a retry
+    after a transient API error calls the LLM again.
+    """
+    if text.startswith("Error"):
+        return {"error": text, "raw_output": ""}
 
-    except json.JSONDecodeError as e:
-        error_msg = f"JSON decoding error from LLM. LLM returned malformed JSON. Error: {e}"
-        parsed = {"error": error_msg, "raw_output": content}
-    except Exception as e:
-        error_msg = f"LLM API interaction error: {e}"
-        parsed = {"error": error_msg, "raw_output": "No LLM response due to API error."}
+    parsed = load_cached_parse(text)
+    if parsed is None:
+        try:
+            # JSON mode guarantees a bare JSON object, so no fence or brace trimming is needed
+            response = client.chat.completions.create(
+                model=MODEL_TIERS["parse"],
+                messages=[{"role": "user", "content": _resume_parse_prompt(text)}],
+                response_format={"type": "json_object"},
+                temperature=0,
+                max_tokens=RESUME_PARSE_MAX_TOKENS
+            )
+            parsed = _decode_parsed_resume(response.choices[0].message.content)
+        except Exception as e:
+            error_msg = f"LLM API interaction error: {e}"
+            parsed = {"error": error_msg, "raw_output": "No LLM response due to API error."}
+        store_cached_parse(text, parsed)
 
     if return_type == 'json':
         return parsed
@@ -182,25 +353,34 @@ def parse_with_llm(text, return_type='json'):
     return {"error": "Invalid return_type"}
 
 
-def extract_jd_from_linkedin_url(url: str) -> str:
-    """
-    Simulates JD content extraction from a LinkedIn URL.
-    """
-    try:
-        job_title = "Data Scientist"
-        try:
-            match = re.search(r'/jobs/view/([^/]+)', url)
-            if match:
-                job_title = match.group(1).replace('-', ' ').title()
-        except:
-            pass
+# Whitespace compaction for resume and JD text: one union pattern so cleanup is a single pass
+_RE_WS_CLEANUP = re.compile(r'(?P<blank>\n[ \t\u00a0]*(?:\n[ \t\u00a0]*)+)|(?P<space>[ \t\u00a0]{2,})')
 
-        if "linkedin.com/jobs/" not in url:
-             return f"[Error: Not a valid LinkedIn Job URL format: {url}]"
+def _ws_cleanup_repl(match):
+    return "\n\n" if match.lastgroup == 'blank' else " "
 
-        
-        # Simulated synthesized JD content 
-        jd_text = f"""
+def compact_whitespace(text):
+    """Collapses runs of blank lines and repeated spaces/tabs in a single regex pass."""
+    return _RE_WS_CLEANUP.sub(_ws_cleanup_repl, text).strip()
+
+# Pasted-JD handling
+_RE_JD_SEPARATOR = re.compile(r'\s*---\s*')
+JD_TITLE_MAX_CHARS = 30
+
+def split_pasted_jds(text, multiple=True):
+    """Splits pasted text into cleaned, non-empty JDs ('---' separates JDs when multiple is set)."""
+    parts = _RE_JD_SEPARATOR.split(text) if multiple else [text]
+    return [jd for jd in map(compact_whitespace, parts) if jd]
+
+def jd_title(text):
+    """First line of a JD, shortened to JD_TITLE_MAX_CHARS for use as its display name."""
+    title = text.split("\n", 1)[0].strip()
+    return f"{title[:JD_TITLE_MAX_CHARS - 3]}..." if len(title) > JD_TITLE_MAX_CHARS else title
+
+_RE_LINKEDIN_JOB_SLUG = re.compile(r'/jobs/view/([^/]+)')
+
+# Simulated synthesized JD content (stripped once here rather than on every call)
+_SIMULATED_JD_TEMPLATE = """
         --- Simulated JD for: {job_title} ---
         
         **Company:** Quantum Analytics Inc.
@@ -219,70 +399,537 @@ def extract_jd_from_linkedin_url(url: str) -> str:
         - Experience with cloud platforms (AWS, Azure, or GCP).
         
         --- End Simulated JD ---
-        """
-        
-        return jd_text.strip()
+        """.strip()
+
+def extract_jd_from_linkedin_url(url: str) -> str:
+    """
+    Simulates JD content extraction from a LinkedIn URL.
+    """
+    try:
+        if "linkedin.com/jobs/" not in url:
+             return f"[Error: Not a valid LinkedIn Job URL format: {url}]"
+
+        match = _RE_LINKEDIN_JOB_SLUG.search(url)
+        job_title = match.group(1).replace('-', ' ').title() if match else "Data Scientist"
+
+        return _SIMULATED_JD_TEMPLATE.format(job_title=job_title)
             
     except Exception as e:
         return f"[Fatal Extraction Error: Simulation failed for URL {url}. Error: {e}]"
 
 
-def evaluate_jd_fit(job_description, parsed_json):
-    """Evaluates how well a resume fits a given job description, including section-wise scores."""
-    if not job_description.strip(): return "Please paste a job description."
-    
-    relevant_resume_data = {
+@st.cache_resource
+def _jd_metadata_cache():
+    """Process-wide store of extracted JD metadata keyed by JD content digest."""
+    return {}
+
+def _jd_metadata_prompt(jd_text):
+    return f"""Extract the following details from the job description and return them as a JSON object
+    with exactly these keys:
+    - "role": the job title (string)
+    - "job_type": one of "Full-time", "Part-time", "Contract", "Internship" (string)
+    - "key_skills": the most important required skills, at most 10 (list of strings)
+
+    Job Description:
+    {compact_whitespace(jd_text)[:MAX_JD_CHARS]}
+    """
+
+def extract_jd_metadata(jd_text):
+    """
+    Returns the role, job type and key skills of a JD as a dict for the candidate JD list.
+    Failures return an empty dict (callers fall back to their defaults) and are not cached.
+    """
+    if jd_text.startswith(("[Error", "[Fatal Extraction Error", "Error")):
+        return {}
+    key = content_digest(jd_text)
+    cached = _jd_metadata_cache().get(key)
+    if cached is not None:
+        return copy.deepcopy(cached)
+    try:
+        response = client.chat.completions.create(
+            model=MODEL_TIERS["parse"],
+            messages=[{"role": "user", "content": _jd_metadata_prompt(jd_text)}],
+            response_format={"type": "json_object"},
+            temperature=0,
+            max_tokens=JD_METADATA_MAX_TOKENS
+        )
+        data = orjson.loads(response.choices[0].message.content)
+    except Exception:
+        return {}
+    skills = data.get('key_skills')
+    metadata = {
+        "role": str(data.get('role') or 'General Analyst'),
+        "job_type": str(data.get('job_type') or 'Full-time'),
+        "key_skills": [str(skill) for skill in skills if skill] if isinstance(skills, list) else [],
+    }
+    _remember(_jd_metadata_cache(), key, metadata, JD_METADATA_CACHE_MAX_ENTRIES)
+    return copy.deepcopy(metadata)
+
+
+FIT_RESULT_CACHE_MAX_ENTRIES = 2048
+JD_METADATA_CACHE_MAX_ENTRIES = 512
+QA_CACHE_MAX_ENTRIES = 256
+INTERVIEW_QUESTIONS_CACHE_MAX_ENTRIES = 128
+KEYWORD_VECTOR_CACHE_MAX_ENTRIES = 1024
+
+# Lexical pre-filter for batch JD matching: JDs whose keyword cosine similarity with the
+# resume falls below this are reported as low fit without an LLM call
+JD_PREFILTER_MIN_SIMILARITY = 0.1
+# Cached keyword vectors store int8 weights: counts are rescaled so the largest is at most this.
+# Cosine similarity ignores the scale, so only rounding of the (already rare) very large counts is lost.
+KEYWORD_WEIGHT_MAX = 127
+# Per-request deadline (seconds) for concurrent fit evaluations; a request that misses it is retried
+JD_FIT_REQUEST_TIMEOUT = 20
+JD_FIT_TIMEOUT_RETRIES = 1
+# Items (resumes or JDs) scored per batched fit request; longer lists are split into concurrent batches
+JD_FIT_BATCH_SIZE = 5
+# Set SHOW_ERROR_TRACEBACKS=1 to append the full traceback to failed fit reports (debugging only;
+# traces can run to many KB and every result row lives in session state)
+SHOW_ERROR_TRACEBACKS = os.getenv("SHOW_ERROR_TRACEBACKS") == "1"
+_RE_KEYWORD = re.compile(r'[a-z][a-z0-9+#]*(?:\.[a-z0-9]+)*')
+_KEYWORD_STOPWORDS = frozenset("""
+    a an and are as at be by for from has have in is it of on or that the this to was were will with
+    our you your we they their who what which can may must should would able ability about also all any
+    experience experienced work working team teams years year strong good knowledge skills skill including using
+    responsibilities requirements required preferred role job position candidate plus etc
+""".split())
+
+# Punctuation is ignored when matching repeat Q&A questions
+_RE_QUESTION_PUNCTUATION = re.compile(r'[^\w\s]')
+
+def _relevant_resume_data(parsed_json):
+    """Selects the resume sections a JD fit evaluation is based on."""
+    return {
         'Skills': parsed_json.get('skills', 'Not found or empty'),
         'Experience': parsed_json.get('experience', 'Not found or empty'),
         'Education': parsed_json.get('education', 'Not found or empty'),
     }
-    resume_summary = json.dumps(relevant_resume_data, indent=2)
 
-    prompt = f"""Evaluate how well the following resume content matches the provided job description.
+def keyword_vector(text):
+    """Builds a sparse term-frequency vector (token -> count) of the text's non-stopword keywords."""
+    return Counter(token for token in _RE_KEYWORD.findall(text.lower()) if token not in _KEYWORD_STOPWORDS)
+
+def _quantize_keyword_vector(vector):
+    """Rescales a `keyword_vector` into int8 weights (0 to KEYWORD_WEIGHT_MAX); vectors already in range are kept exactly."""
+    top = max(vector.values(), default=0)
+    if top <= KEYWORD_WEIGHT_MAX:
+        return vector
+    scale = KEYWORD_WEIGHT_MAX / top
+    return {token: max(1, round(count * scale)) for token, count in vector.items()}
+
+@st.cache_resource
+def _keyword_vector_cache():
+    """Process-wide store of (quantized `keyword_vector`, L2 norm) pairs keyed by text content digest."""
+    return {}
+
+def _cached_keyword_entry(text):
+    key = content_digest(text)
+    cache = _keyword_vector_cache()
+    entry = cache.get(key)
+    if entry is None:
+        vector = _quantize_keyword_vector(keyword_vector(text))
+        entry = (vector, _keyword_norm(vector))
+        _remember(cache, key, entry, KEYWORD_VECTOR_CACHE_MAX_ENTRIES)
+    return entry
+
+def _keyword_norm(vector):
+    return math.sqrt(sum(count * count for count in vector.values()))
+
+def _keyword_dot(vector_a, vector_b):
+    if len(vector_a) > len(vector_b):
+        vector_a, vector_b = vector_b, vector_a
+    return sum(count * vector_b.get(token, 0) for token, count in vector_a.items())
+
+def keyword_similarities(text, other_texts):
+    """
+    Cosine similarity of `text` against each of `other_texts`, in input order.
+    Vectors and their norms come from the keyword cache, so each pair costs one sparse dot product.
+    """
+    vector, norm = _cached_keyword_entry(text)
+    similarities = []
+    for other_text in other_texts:
+        other_vector, other_norm = _cached_keyword_entry(other_text)
+        similarities.append(_keyword_dot(vector, other_vector) / (norm * other_norm) if norm and other_norm else 0.0)
+    return similarities
+
+def _resume_sections_digest(parsed_json):
+    return content_digest(orjson.dumps(_relevant_resume_data(parsed_json), option=orjson.OPT_SORT_KEYS))
+
+def _remember(cache, key, value, max_entries):
+    """Stores a value in a bounded cache dict, evicting the oldest entry when full."""
+    if len(cache) >= max_entries:
+        # Dicts keep insertion order, so this evicts the oldest entry
+        cache.pop(next(iter(cache)))
+    cache[key] = value
+
+def _format_fit_report(result):
+    """Renders one structured JD fit result as the plain-text report shown in the dashboards."""
+    strengths = "\n".join(f"- {point}" for point in result.get('strengths', [])) or "- N/A"
+    gaps = "\n".join(f"- {point}" for point in result.get('gaps', [])) or "- N/A"
+    return f"""Overall Fit Score: {result.get('overall_score', 'N/A')}/10
+
+--- Section Match Analysis ---
+Skills Match: {result.get('skills_match', 'N/A')}%
+Experience Match: {result.get('experience_match', 'N/A')}%
+Education Match: {result.get('education_match', 'N/A')}%
+
+Strengths/Matches:
+{strengths}
+
+Gaps/Areas for Improvement:
+{gaps}
+
+Overall Summary: {result.get('summary', 'N/A')}"""
+
+
+def _jd_fit_batch_prompt(job_description, parsed_jsons):
+    """Builds the JSON-mode prompt that scores one or more resumes against a single JD."""
+    resumes = [
+        {'id': i, **_relevant_resume_data(parsed_json)}
+        for i, parsed_json in enumerate(parsed_jsons)
+    ]
+
+    # Fixed instructions, then the shared JD, then the resumes: requests for the same JD share a long prompt prefix
+    return f"""Evaluate how well each of the following resumes matches the provided job description.
     
-    Job Description: {job_description}
+    For every resume provide:
+    - overall_score: integer score out of 10
+    - skills_match, experience_match, education_match: integer percentages (0-100)
+    - strengths: list of key points where the resume aligns well with the JD
+    - gaps: list of key JD requirements that are missing or weak in the resume
+    - summary: a concise summary of the fit
     
-    Resume Sections for Analysis:
-    {resume_summary}
+    Respond strictly with a JSON object of the form:
+    {{"results": [{{"id": 0, "overall_score": 7, "skills_match": 80, "experience_match": 60, "education_match": 90, "strengths": ["..."], "gaps": ["..."], "summary": "..."}}]}}
+    Include exactly one entry per resume id.
     
-    Provide a detailed evaluation structured as follows:
-    1.  **Overall Fit Score:** A score out of 10.
-    2.  **Section Match Percentages:** A percentage score for the match in the key sections (Skills, Experience, Education).
-    3.  **Strengths/Matches:** Key points where the resume aligns well with the JD.
-    4.  **Gaps/Areas for Improvement:** Key requirements in the JD that are missing or weak in the resume.
-    5.  **Overall Summary:** A concise summary of the fit.
+    Job Description: {job_description[:MAX_JD_CHARS]}
     
-    **Format the output strictly as follows, ensuring the scores are easily parsable (use brackets or no brackets around scores):**
-    Overall Fit Score: [Score]/10
+    Resumes for Analysis (JSON array, each with an "id"):
+    {to_pretty_json(resumes)}
+    """
+
+
+def _jd_fit_batch_results(content, count):
+    """Maps a JSON-mode batch response back onto `count` items by id; omitted items become None."""
+    by_id = {}
+    for item in orjson.loads(content).get('results', []):
+        if not isinstance(item, dict):
+            continue
+        # The model sometimes returns ids as strings ("1"); items with unusable ids are skipped
+        try:
+            by_id[int(item['id'])] = item
+        except (KeyError, TypeError, ValueError):
+            continue
+
+    results = []
+    for i in range(count):
+        item = by_id.get(i)
+        if item is None:
+            results.append(None)
+            continue
+        results.append({
+            "overall_score": str(item.get('overall_score', 'N/A')),
+            "skills_percent": str(item.get('skills_match', 'N/A')),
+            "experience_percent": str(item.get('experience_match', 'N/A')),
+            "education_percent": str(item.get('education_match', 'N/A')),
+            "full_analysis": _format_fit_report(item)
+        })
+    return results
+
+
+async def _run_fit_batches(batches, max_concurrency, on_progress=None):
+    """
+    Runs (prompt, item count) batch requests concurrently; a failed request yields None for each of its items.
+    `on_progress(done, total)` counts items as their batch finishes.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+    total = sum(count for _, count in batches)
+    done = 0
+
+    async def _run_batch(prompt, count):
+        nonlocal done
+        async with semaphore:
+            try:
+                response = await aclient.chat.completions.create(
+                    model=MODEL_TIERS["evaluate"],
+                    messages=[{"role": "user", "content": prompt}],
+                    response_format={"type": "json_object"},
+                    temperature=0,
+                    max_tokens=JD_FIT_ITEM_MAX_TOKENS * count
+                )
+                results = _jd_fit_batch_results(response.choices[0].message.content, count)
+            except Exception:
+                results = [None] * count
+        done += count
+        if on_progress:
+            on_progress(done, total)
+        return results
+
+    async with _async_groq_client() as aclient:
+        results = await asyncio.gather(*(_run_batch(prompt, count) for prompt, count in batches))
+    return [result for batch_results in results for result in batch_results]
+
+
+def _chunked(items, size):
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+@st.cache_resource
+def _fit_result_cache():
+    """Process-wide store of structured fit results keyed by (JD digest, resume sections digest)."""
+    return {}
+
+def _with_cached_fits(keys, evaluate):
+    """
+    Serves fit results from `_fit_result_cache` and calls `evaluate(miss_indices)` for the rest,
+    which must return their results in the same order. Only successful (dict) results are cached.
+    """
+    cache = _fit_result_cache()
+    results = [cache.get(key) for key in keys]
+    misses = [i for i, result in enumerate(results) if result is None]
+    if misses:
+        for i, result in zip(misses, evaluate(misses)):
+            if isinstance(result, dict):
+                _remember(cache, keys[i], result, FIT_RESULT_CACHE_MAX_ENTRIES)
+            results[i] = result
+    # Callers annotate the rows they get back, so never hand out the cached dicts
+    return [dict(result) if isinstance(result, dict) else result for result in results]
+
+def _jd_fit_keys(job_description, parsed_jsons):
+    jd_digest = content_digest(job_description)
+    return [(jd_digest, _resume_sections_digest(parsed_json)) for parsed_json in parsed_jsons]
+
+def _resume_fit_keys(job_descriptions, parsed_json):
+    resume_digest = _resume_sections_digest(parsed_json)
+    return [(content_digest(job_description), resume_digest) for job_description in job_descriptions]
+
+
+def evaluate_jd_fit_batch(job_description, parsed_jsons, max_concurrency=8, on_progress=None):
+    """
+    Evaluates several resumes against one job description in a single LLM request
+    (more than JD_FIT_BATCH_SIZE resumes are split into batches that run concurrently).
+    Returns one dict per resume, in input order, with the score fields and a full text report,
+    or None for any resume the LLM left out of its answer. Pairs scored before are not re-sent;
+    `on_progress(done, total)` follows the ones that are.
+    """
+    if not parsed_jsons:
+        return []
+    return _with_cached_fits(
+        _jd_fit_keys(job_description, parsed_jsons),
+        lambda misses: _evaluate_jd_fit_batch(job_description, [parsed_jsons[i] for i in misses], max_concurrency, on_progress)
+    )
+
+def _evaluate_jd_fit_batch(job_description, parsed_jsons, max_concurrency, on_progress):
+    if len(parsed_jsons) > JD_FIT_BATCH_SIZE:
+        batches = [(_jd_fit_batch_prompt(job_description, chunk), len(chunk)) for chunk in _chunked(parsed_jsons, JD_FIT_BATCH_SIZE)]
+        return asyncio.run(_run_fit_batches(batches, max_concurrency, on_progress))
+
+    response = client.chat.completions.create(
+        model=MODEL_TIERS["evaluate"],
+        messages=[{"role": "user", "content": _jd_fit_batch_prompt(job_description, parsed_jsons)}],
+        response_format={"type": "json_object"},
+        temperature=0,
+        max_tokens=JD_FIT_ITEM_MAX_TOKENS * len(parsed_jsons)
+    )
+    if on_progress:
+        on_progress(len(parsed_jsons), len(parsed_jsons))
+    return _jd_fit_batch_results(response.choices[0].message.content, len(parsed_jsons))
+
+
+def _resume_fit_batch_prompt(job_descriptions, parsed_json, resume_summary=None):
+    """
+    Builds the JSON-mode prompt that scores one resume against several JDs, sharing the resume prefix.
+    Pass a pre-rendered `resume_summary` when building many prompts for the same resume.
+    """
+    if resume_summary is None:
+        resume_summary = to_pretty_json(_relevant_resume_data(parsed_json))
+    jds = [
+        {'id': i, 'job_description': job_description[:MAX_JD_CHARS]}
+        for i, job_description in enumerate(job_descriptions)
+    ]
+
+    # Fixed instructions, then the shared resume, then the JDs: requests for the same resume share a long prompt prefix
+    return f"""Evaluate how well the following resume matches each of the provided job descriptions.
     
-    --- Section Match Analysis ---
-    Skills Match: [XX]%
-    Experience Match: [YY]%
-    Education Match: [ZZ]%
+    For every job description provide:
+    - overall_score: integer score out of 10
+    - skills_match, experience_match, education_match: integer percentages (0-100)
+    - strengths: list of key points where the resume aligns well with the JD
+    - gaps: list of key JD requirements that are missing or weak in the resume
+    - summary: a concise summary of the fit
     
-    Strengths/Matches:
-    - Point 1
-    - Point 2
+    Respond strictly with a JSON object of the form:
+    {{"results": [{{"id": 0, "overall_score": 7, "skills_match": 80, "experience_match": 60, "education_match": 90, "strengths": ["..."], "gaps": ["..."], "summary": "..."}}]}}
+    Include exactly one entry per job description id.
     
-    Gaps/Areas for Improvement:
-    - Point 1
-    - Point 2
+    Resume Sections for Analysis:
+    {resume_summary}
     
-    Overall Summary: [Concise summary]
+    Job Descriptions (JSON array, each with an "id"):
+    {to_pretty_json(jds)}
     """
 
+
+def evaluate_resume_fit_batch(job_descriptions, parsed_json, max_concurrency=8, on_progress=None):
+    """
+    Evaluates one resume against several job descriptions in a single LLM request
+    (more than JD_FIT_BATCH_SIZE JDs are split into batches that run concurrently).
+    Returns one dict per JD, in input order, shaped like `evaluate_jd_fit_batch` results (None if omitted).
+    Pairs scored before are not re-sent; `on_progress(done, total)` follows the ones that are.
+    """
+    if not job_descriptions:
+        return []
+    return _with_cached_fits(
+        _resume_fit_keys(job_descriptions, parsed_json),
+        lambda misses: _evaluate_resume_fit_batch([job_descriptions[i] for i in misses], parsed_json, max_concurrency, on_progress)
+    )
+
+def _evaluate_resume_fit_batch(job_descriptions, parsed_json, max_concurrency, on_progress):
+    if len(job_descriptions) > JD_FIT_BATCH_SIZE:
+        resume_summary = to_pretty_json(_relevant_resume_data(parsed_json))
+        batches = [
+            (_resume_fit_batch_prompt(chunk, parsed_json, resume_summary), len(chunk))
+            for chunk in _chunked(job_descriptions, JD_FIT_BATCH_SIZE)
+        ]
+        return asyncio.run(_run_fit_batches(batches, max_concurrency, on_progress))
+
     response = client.chat.completions.create(
-        model=GROQ_MODEL, 
-        messages=[{"role": "user", "content": prompt}], 
-        temperature=0.3
+        model=MODEL_TIERS["evaluate"],
+        messages=[{"role": "user", "content": _resume_fit_batch_prompt(job_descriptions, parsed_json)}],
+        response_format={"type": "json_object"},
+        temperature=0,
+        max_tokens=JD_FIT_ITEM_MAX_TOKENS * len(job_descriptions)
     )
-    return response.choices[0].message.content.strip()
+    if on_progress:
+        on_progress(len(job_descriptions), len(job_descriptions))
+    return _jd_fit_batch_results(response.choices[0].message.content, len(job_descriptions))
 
 
-def evaluate_interview_answers(qa_list, parsed_json):
-    """Evaluates the user's answers against the resume content and provides feedback."""
-    
-    resume_summary = json.dumps(parsed_json, indent=2)
+async def _evaluate_fit_one(aclient, prompt):
+    response = await aclient.chat.completions.create(
+        model=MODEL_TIERS["evaluate"],
+        messages=[{"role": "user", "content": prompt}],
+        response_format={"type": "json_object"},
+        temperature=0,
+        max_tokens=JD_FIT_ITEM_MAX_TOKENS
+    )
+    result = _jd_fit_batch_results(response.choices[0].message.content, 1)[0]
+    if result is None:
+        raise ValueError("The LLM returned no evaluation for this request.")
+    return result
+
+
+async def _evaluate_fit_all(prompts, max_concurrency, timeout, on_progress=None):
+    """Runs single-item fit prompts concurrently; a timed-out request is retried."""
+    semaphore = asyncio.Semaphore(max_concurrency)
+    done = 0
+
+    async def _evaluate_prompt(prompt):
+        nonlocal done
+        try:
+            async with semaphore:
+                for attempt in range(JD_FIT_TIMEOUT_RETRIES + 1):
+                    try:
+                        return await asyncio.wait_for(_evaluate_fit_one(aclient, prompt), timeout=timeout)
+                    except asyncio.TimeoutError:
+                        if attempt == JD_FIT_TIMEOUT_RETRIES:
+                            raise
+        finally:
+            done += 1
+            if on_progress:
+                on_progress(done, len(prompts))
+
+    async with _async_groq_client() as aclient:
+        return await asyncio.gather(*(_evaluate_prompt(prompt) for prompt in prompts), return_exceptions=True)
+
+
+def evaluate_jd_fit_many(job_description, parsed_jsons, max_concurrency=8, timeout=JD_FIT_REQUEST_TIMEOUT, on_progress=None):
+    """
+    Evaluates resumes one request each, concurrently (at most `max_concurrency` in flight).
+    Returns the same dicts as `evaluate_jd_fit_batch`, in input order; a failed call yields its exception instead.
+    """
+    def evaluate(misses):
+        prompts = [_jd_fit_batch_prompt(job_description, [parsed_jsons[i]]) for i in misses]
+        return asyncio.run(_evaluate_fit_all(prompts, max_concurrency, timeout, on_progress))
+    return _with_cached_fits(_jd_fit_keys(job_description, parsed_jsons), evaluate)
+
+
+def evaluate_resume_fit_many(job_descriptions, parsed_json, max_concurrency=8, timeout=JD_FIT_REQUEST_TIMEOUT, on_progress=None):
+    """
+    Evaluates one resume against each JD with its own request, concurrently.
+    Returns the same dicts as `evaluate_resume_fit_batch`, in input order; a failed call yields its exception instead.
+    """
+    def evaluate(misses):
+        # Render the resume once; every per-JD prompt starts with the same instructions + resume prefix
+        resume_summary = to_pretty_json(_relevant_resume_data(parsed_json))
+        prompts = [_resume_fit_batch_prompt([job_descriptions[i]], parsed_json, resume_summary) for i in misses]
+        return asyncio.run(_evaluate_fit_all(prompts, max_concurrency, timeout, on_progress))
+    return _with_cached_fits(_resume_fit_keys(job_descriptions, parsed_json), evaluate)
+
+
+def fit_error_result(exc):
+    """Result row for a fit evaluation that raised `exc`, shaped like a successful one."""
+    report = f"Error running analysis: {exc}"
+    if SHOW_ERROR_TRACEBACKS:
+        report += "\n\n```\n" + "".join(traceback.format_exception(exc)) + "```"
+    return {
+        "overall_score": "Error",
+        "skills_percent": "Error",
+        "experience_percent": "Error",
+        "education_percent": "Error",
+        "full_analysis": report
+    }
+
+
+def _fits_with_fallback(evaluate_batch, evaluate_many, count, on_progress):
+    """
+    Runs the batched fit evaluation, re-runs each item it could not score with its own request,
+    and turns items that still fail into `fit_error_result` rows. Always returns `count` dicts.
+    """
+    batch_progress = on_progress and (lambda done, total: on_progress(done, total, False))
+    try:
+        results = evaluate_batch(batch_progress)
+    except Exception:
+        results = [None] * count
+
+    missing = [i for i, result in enumerate(results) if result is None]
+    if missing:
+        if on_progress:
+            on_progress(0, len(missing), True)
+        retry_progress = on_progress and (lambda done, total: on_progress(done, total, True))
+        try:
+            retried = evaluate_many(missing, retry_progress)
+        except Exception as e:
+            retried = [e] * len(missing)
+        for i, result in zip(missing, retried):
+            results[i] = fit_error_result(result) if isinstance(result, Exception) else result
+    return results
+
+
+def match_resumes_to_jd(job_description, parsed_jsons, on_progress=None):
+    """
+    Scores several resumes against one JD (batched, with per-resume retries), one result dict per resume.
+    `on_progress(done, total, retrying)` reports the batched pass, then the retry pass if one is needed.
+    """
+    return _fits_with_fallback(
+        lambda progress: evaluate_jd_fit_batch(job_description, parsed_jsons, on_progress=progress),
+        lambda missing, progress: evaluate_jd_fit_many(job_description, [parsed_jsons[i] for i in missing], on_progress=progress),
+        len(parsed_jsons), on_progress
+    )
+
+
+def match_jds_to_resume(job_descriptions, parsed_json, on_progress=None):
+    """Scores one resume against several JDs; the transpose of `match_resumes_to_jd`."""
+    return _fits_with_fallback(
+        lambda progress: evaluate_resume_fit_batch(job_descriptions, parsed_json, on_progress=progress),
+        lambda missing, progress: evaluate_resume_fit_many([job_descriptions[i] for i in missing], parsed_json, on_progress=progress),
+        len(job_descriptions), on_progress
+    )
+
+
+def _interview_evaluation_prompt(qa_list, parsed_json):
+    resume_summary = to_pretty_json(parsed_json)
     
     qa_summary = "\n---\n".join([
         f"Q: {item['question']}\nA: {item['answer']}" 
@@ -325,124 +972,294 @@ def evaluate_interview_answers(qa_list, parsed_json):
     Total Score: [Y]/{len(qa_list) * 10}
     Overall Summary: [A concise summary of the candidate's performance and next steps.]
     """
+    return prompt
 
-    response = client.chat.completions.create(
-        model=GROQ_MODEL, 
-        messages=[{"role": "user", "content": prompt}], 
-        temperature=0.3
+def evaluate_interview_answers(qa_list, parsed_json):
+    """Evaluates the user's answers against the resume content and provides feedback."""
+    return "".join(evaluate_interview_answers_stream(qa_list, parsed_json)).strip()
+
+def evaluate_interview_answers_stream(qa_list, parsed_json):
+    """Streaming variant of `evaluate_interview_answers` for `st.write_stream`."""
+    yield from stream_completion(
+        _interview_evaluation_prompt(qa_list, parsed_json), temperature=0.3,
+        max_tokens=INTERVIEW_EVALUATION_MAX_TOKENS, tier="evaluate"
     )
-    return response.choices[0].message.content.strip()
-
-def dump_to_excel(parsed_json, filename):
-    """Dumps parsed JSON data to an Excel file."""
-    wb = openpyxl.Workbook()
-    ws = wb.active
-    ws.title = "Profile Data"
-    ws.append(["Category", "Details"])
-    
-    section_order = ['name', 'email', 'phone', 'github', 'linkedin', 'experience', 'education', 'skills', 'projects', 'certifications', 'strength', 'personal_details']
-    
-    for section_key in section_order:
-        if section_key in parsed_json and parsed_json[section_key]:
-            content = parsed_json[section_key]
-            
-            if section_key in ['name', 'email', 'phone', 'github', 'linkedin']:
-                ws.append([section_key.replace('_', ' ').title(), str(content)])
-            else:
-                ws.append([])
-                ws.append([section_key.replace('_', ' ').title()])
-                
-                if isinstance(content, list):
-                    for item in content:
-                        if item:
-                            ws.append(["", str(item)])
-                elif isinstance(content, dict):
-                    for k, v in content.items():
-                        if v:
-                            ws.append(["", f"{k.replace('_', ' ').title()}: {v}"])
-                else:
-                    ws.append(["", str(content)])
 
-    wb.save(filename)
-    with open(filename, "rb") as f:
-        return f.read()
+# Score columns of the match-results tables; coerced to numbers so they sort numerically
+MATCH_SCORE_COLUMNS = ["Fit Score (out of 10)", "Skills (%)", "Experience (%)", "Education (%)", "Keyword Similarity"]
+
+def match_results_frame(results, columns):
+    """
+    Builds a match-results DataFrame straight from the result dicts. `columns` maps result keys to
+    display names, in display order; score columns are made numeric ('N/A'/'Error' become empty cells).
+    """
+    import pandas as pd
+
+    df = pd.DataFrame.from_records(results, columns=list(columns)).rename(columns=columns)
+    for column in MATCH_SCORE_COLUMNS:
+        if column in df:
+            df[column] = pd.to_numeric(df[column], errors='coerce')
+    return df
 
-def parse_and_store_resume(uploaded_file, file_name_key='default'):
+EXCEL_SECTION_ORDER = ['name', 'email', 'phone', 'github', 'linkedin', 'experience', 'education', 'skills', 'projects', 'certifications', 'strength', 'personal_details']
+EXCEL_CONTACT_SECTIONS = frozenset(['name', 'email', 'phone', 'github', 'linkedin'])
+
+def _excel_rows(parsed_json):
+    """Yields the worksheet rows for `dump_to_excel`, one section at a time."""
+    yield ["Category", "Details"]
+
+    ordered_keys = [k for k in EXCEL_SECTION_ORDER if parsed_json.get(k)]
+    for section_key in ordered_keys:
+        content = parsed_json[section_key]
+        title = section_key.replace('_', ' ').title()
+
+        if section_key in EXCEL_CONTACT_SECTIONS:
+            yield [title, str(content)]
+            continue
+
+        yield []
+        yield [title]
+        if isinstance(content, list):
+            yield from (["", str(item)] for item in content if item)
+        elif isinstance(content, dict):
+            yield from (["", f"{k.replace('_', ' ').title()}: {v}"] for k, v in content.items() if v)
+        else:
+            yield ["", str(content)]
+
+def dump_to_excel(parsed_json):
+    """Dumps parsed JSON data to an in-memory Excel workbook and returns its bytes."""
+    import openpyxl
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet("Profile Data")
+    for row in _excel_rows(parsed_json):
+        ws.append(row)
+
+    buffer = io.BytesIO()
+    wb.save(buffer)
+    return buffer.getvalue()
+
+def parse_and_store_resume(uploaded_file, file_name_key='default', source_type='file'):
     """
     Handles file upload, parsing, and stores results.
+    With `source_type='text'`, `uploaded_file` is pasted resume text rather than an uploaded file.
     """
     
-    if not isinstance(uploaded_file, UploadedFile):
+    if source_type == 'text':
+        text = uploaded_file
+        digest = content_digest(text)
+        file_name = "Pasted CV"
+    elif not isinstance(uploaded_file, UploadedFile):
         # Allow passing the groq client error if it was caught during init
         if not GROQ_API_KEY:
              return {"error": "GROQ_API_KEY is not set. Cannot run LLM parser.", "full_text": ""}
         st.error(f"Internal Error: Expected a single file, but received object type: {type(uploaded_file)}. Cannot parse.")
         return {"error": "Invalid file input type passed to parser.", "full_text": ""}
+    else:
+        # Hash the zero-copy buffer first so a repeat upload skips copying, extraction and the LLM
+        text = None
+        digest = content_digest(uploaded_file.getbuffer())
+        file_name = uploaded_file.name
 
-    temp_dir = tempfile.mkdtemp()
-    
-    temp_path = os.path.join(temp_dir, uploaded_file.name) 
-    with open(temp_path, "wb") as f:
-        f.write(uploaded_file.getbuffer()) 
+    resume_cache = _resume_cache()
+    cached = resume_cache.get(digest)
 
-    file_type = get_file_type(temp_path)
-    text = extract_content(file_type, temp_path)
-    
-    if text.startswith("Error"):
-        return {"error": text, "full_text": text}
+    if cached is None:
+        if text is None:
+            # Shares the digest-keyed extracted-text cache: a retry after a failed LLM parse re-runs only the LLM call
+            text = extract_uploaded_files([uploaded_file], digests=[digest])[0]
+            
+            if text.startswith(("Error", "Fatal Extraction Error")):
+                return {"error": text, "full_text": text}
 
-    parsed = parse_with_llm(text, return_type='json')
-    
-    if not parsed or "error" in parsed:
-        return {"error": parsed.get('error', 'Unknown parsing error'), "full_text": text}
+        parsed = parse_with_llm(text, return_type='json')
+        
+        if not parsed or "error" in parsed:
+            return {"error": parsed.get('error', 'Unknown parsing error'), "full_text": text}
 
-    # Generate Excel data for download if needed 
-    excel_data = None
-    if file_name_key == 'single_resume_candidate':
-        try:
-            name = parsed.get('name', 'candidate').replace(' ', '_').strip()
-            name = "".join(c for c in name if c.isalnum() or c in ('_', '-')).rstrip()
-            if not name: name = "candidate"
-            excel_filename = os.path.join(tempfile.gettempdir(), f"{name}_parsed_data.xlsx")
-            excel_data = dump_to_excel(parsed, excel_filename)
-        except Exception as e:
-            pass
+        cached = _remember_resume(digest, parsed, text)
+
+    return _stored_resume_result(digest, cached, file_name)
+
+
+def _stored_resume_result(digest, cached, file_name):
+    """Builds the `parse_and_store_resume` result for a resume cache entry."""
+    # Callers mutate the parsed dict (e.g. overriding 'name'), so never hand out the cached one
+    parsed = dict(cached["parsed"])
     
     return {
+        "digest": digest,
         "parsed": parsed,
-        "full_text": text,
-        "excel_data": excel_data,
-        "name": parsed.get('name', uploaded_file.name.split('.')[0])
+        "full_text": cached["full_text"],
+        "name": parsed.get('name', file_name.split('.')[0])
     }
 
 
-def qa_on_resume(question):
-    """Chatbot for Resume (Q&A) using LLM."""
+async def _parse_resumes_all(texts, max_concurrency, on_progress):
+    """
+    Parses `texts` with at most `max_concurrency` requests in flight, returning results in input order.
+    The longest resumes are started first so a slow parse isn't left queued behind short ones at the end.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+    done = 0
+
+    async def _parse_one(text):
+        nonlocal done
+        async with semaphore:
+            parsed = await _parse_resume_async(aclient, text)
+        done += 1
+        if on_progress:
+            on_progress(done, len(texts))
+        return parsed
+
+    order = sorted(range(len(texts)), key=lambda i: len(texts[i]), reverse=True)
+    async with _async_groq_client() as aclient:
+        parsed_all = await asyncio.gather(*(_parse_one(texts[i]) for i in order))
+    results = [None] * len(texts)
+    for i, parsed in zip(order, parsed_all):
+        results[i] = parsed
+    return results
+
+
+def parse_and_store_resumes(uploaded_files, file_name_key='default', max_concurrency=8, on_progress=None, digests=None):
+    """
+    Multi-file `parse_and_store_resume`: cached uploads are served directly, the rest are extracted
+    in a thread pool and parsed with concurrent LLM requests (at most `max_concurrency` in flight).
+    Returns one result per file, in input order. `on_progress(done, total)` is called as parses finish.
+    Pass the files' `content_digest`s as `digests` when the caller has already computed them.
+    """
+    if not GROQ_API_KEY:
+        return [{"error": "GROQ_API_KEY is not set. Cannot run LLM parser.", "full_text": ""} for _ in uploaded_files]
+
+    resume_cache = _resume_cache()
+    if digests is None:
+        digests = [content_digest(f.getbuffer()) for f in uploaded_files]
+    results = [None] * len(uploaded_files)
+
+    # Entries are held here as well as in the cache, since a large batch can evict its own early entries
+    entries = {i: resume_cache[digest] for i, digest in enumerate(digests) if digest in resume_cache}
+    misses = [i for i in range(len(digests)) if i not in entries]
+    texts = extract_uploaded_files([uploaded_files[i] for i in misses], digests=[digests[i] for i in misses])
+    to_parse = []
+    for i, text in zip(misses, texts):
+        if text.startswith(("Error", "Fatal Extraction Error")):
+            results[i] = {"error": text, "full_text": text}
+            continue
+        parsed = load_cached_parse(text)
+        if parsed is None:
+            to_parse.append((i, text))
+        else:
+            entries[i] = _remember_resume(digests[i], parsed, text)
+
+    if to_parse:
+        parsed_all = asyncio.run(_parse_resumes_all([text for _, text in to_parse], max_concurrency, on_progress))
+        for (i, text), parsed in zip(to_parse, parsed_all):
+            if not parsed or "error" in parsed:
+                results[i] = {"error": parsed.get('error', 'Unknown parsing error'), "full_text": text}
+            else:
+                store_cached_parse(text, parsed)
+                entries[i] = _remember_resume(digests[i], parsed, text)
+
+    for i, uploaded_file in enumerate(uploaded_files):
+        if results[i] is None:
+            results[i] = _stored_resume_result(digests[i], entries[i], uploaded_file.name)
+    return results
+
+
+@st.cache_resource
+def _qa_cache():
+    """Process-wide store of Q&A answers keyed by (resume text digest, parsed JSON digest, question)."""
+    return {}
+
+def _normalize_question(question):
+    """Lower-cases a question and drops punctuation/extra spaces so trivial rewordings share a cache entry."""
+    return " ".join(_RE_QUESTION_PUNCTUATION.sub(" ", question.lower()).split())
+
+def _qa_cache_key(question):
+    """Cache key for a resume Q&A question against the currently loaded resume."""
+    return (
+        content_digest(st.session_state.full_text),
+        json_digest(st.session_state.parsed),
+        _normalize_question(question),
+    )
+
+def _qa_prompt(question):
+    """Builds the resume Q&A prompt for the currently loaded resume."""
     parsed_json = st.session_state.parsed
     full_text = st.session_state.full_text
-    prompt = f"""Given the following resume information:
-    Resume Text: {full_text}
-    Parsed Resume Data (JSON): {json.dumps(parsed_json, indent=2)}
+
+    # The parsed JSON already covers any section the question names; only fall back to
+    # (a bounded slice of) the raw text when the question is about something else.
+    question_lower = question.lower()
+    if any(section.replace('_', ' ') in question_lower for section in parsed_json):
+        resume_context = f"Parsed Resume Data (JSON): {to_pretty_json(parsed_json)}"
+    else:
+        resume_context = f"""Resume Text: {full_text[:QA_FULL_TEXT_MAX_CHARS]}
+    Parsed Resume Data (JSON): {to_pretty_json(parsed_json)}"""
+
+    return f"""Given the following resume information:
+    {resume_context}
     Answer the following question about the resume concisely and directly.
     If the information is not present, state that clearly.
     Question: {question}
     """
-    response = client.chat.completions.create(model=GROQ_MODEL, messages=[{"role": "user", "content": prompt}], temperature=0.4)
-    return response.choices[0].message.content.strip()
 
-def generate_interview_questions(parsed_json, section):
-    """Generates categorized interview questions using LLM."""
+def qa_on_resume(question):
+    """Chatbot for Resume (Q&A) using LLM."""
+    key = _qa_cache_key(question)
+    cached = _qa_cache().get(key)
+    if cached is not None:
+        return cached
+
+    response = client.chat.completions.create(model=MODEL_TIERS["qa"], messages=[{"role": "user", "content": _qa_prompt(question)}], temperature=0.4, max_tokens=QA_MAX_TOKENS)
+    answer = response.choices[0].message.content.strip()
+    _remember(_qa_cache(), key, answer, QA_CACHE_MAX_ENTRIES)
+    return answer
+
+def stream_completion(prompt, temperature, max_tokens=QA_MAX_TOKENS, tier="qa"):
+    """Yields the `tier` model's answer to a single-message prompt chunk by chunk as it is generated."""
+    stream = client.chat.completions.create(
+        model=MODEL_TIERS[tier],
+        messages=[{"role": "user", "content": prompt}],
+        temperature=temperature,
+        max_tokens=max_tokens,
+        stream=True
+    )
+    for chunk in stream:
+        delta = chunk.choices[0].delta.content
+        if delta:
+            yield delta
+
+def qa_on_resume_stream(question):
+    """Streaming variant of `qa_on_resume` for `st.write_stream`; shares its answer cache."""
+    key = _qa_cache_key(question)
+    cached = _qa_cache().get(key)
+    if cached is not None:
+        yield cached
+        return
+
+    chunks = []
+    for delta in stream_completion(_qa_prompt(question), temperature=0.4):
+        chunks.append(delta)
+        yield delta
+    _remember(_qa_cache(), key, "".join(chunks).strip(), QA_CACHE_MAX_ENTRIES)
+
+@st.cache_resource
+def _interview_questions_cache():
+    """Process-wide store of generated interview questions keyed by (section title, section content digest)."""
+    return {}
+
+def _interview_section(parsed_json, section):
+    """Returns the display title and prompt text of a parsed resume section."""
     section_title = section.replace("_", " ").title()
     section_content = parsed_json.get(section, "")
     if isinstance(section_content, (list, dict)):
-        section_content = json.dumps(section_content, indent=2)
+        section_content = to_pretty_json(section_content)
     elif not isinstance(section_content, str):
         section_content = str(section_content)
+    return section_title, section_content
 
-    if not section_content.strip():
-        return f"No significant content found for the '{section_title}' section in the parsed resume. Please select a section with relevant data to generate questions."
-
-    prompt = f"""Based on the following {section_title} section from the resume: {section_content}
+def _interview_questions_prompt(section_title, section_content):
+    return f"""Based on the following {section_title} section from the resume: {section_content}
 Generate 3 interview questions each for these levels: Generic, Basic, Intermediate, Difficult.
 **IMPORTANT: Format the output strictly as follows, with level headers and questions starting with 'Qx:':**
 [Generic]
@@ -455,9 +1272,27 @@ Q1: Question text...
 [Difficult]
 Q3: Question text...
     """
-    response = client.chat.completions.create(
-        model=GROQ_MODEL, 
-        messages=[{"role": "user", "content": prompt}], 
-        temperature=0.5
-    )
-    return response.choices[0].message.content.strip()
+
+def generate_interview_questions(parsed_json, section):
+    """Generates categorized interview questions using LLM."""
+    return "".join(generate_interview_questions_stream(parsed_json, section)).strip()
+
+def generate_interview_questions_stream(parsed_json, section):
+    """Streaming variant of `generate_interview_questions` for `st.write_stream`; shares its cache."""
+    section_title, section_content = _interview_section(parsed_json, section)
+    if not section_content.strip():
+        yield f"No significant content found for the '{section_title}' section in the parsed resume. Please select a section with relevant data to generate questions."
+        return
+
+    key = (section_title, content_digest(section_content))
+    cached = _interview_questions_cache().get(key)
+    if cached is not None:
+        yield cached
+        return
+
+    chunks = []
+    prompt = _interview_questions_prompt(section_title, section_content)
+    for delta in stream_completion(prompt, temperature=0.5, max_tokens=INTERVIEW_QUESTIONS_MAX_TOKENS):
+        chunks.append(delta)
+        yield delta
+    _remember(_interview_questions_cache(), key, "".join(chunks).strip(), INTERVIEW_QUESTIONS_CACHE_MAX_ENTRIES)